@@ -1,39 +1,215 @@
 """
 Blue Prism → OpenAI Bridge API
 
-A minimal Flask API that handles all OpenAI SDK complexity,
+A minimal Quart (async Flask) API that handles all OpenAI SDK complexity,
 allowing Blue Prism to make simple HTTP requests.
 
 Usage:
-    python app.py              # Development mode
-    waitress-serve app:app     # Production mode
+    python app.py                               # Development mode
+    hypercorn --config hypercorn.toml app:app   # Production mode
 """
 
+import io
 import os
+import re
+import json
+import gzip
+import zlib
 import time
+import asyncio
+import queue
+import atexit
+import hashlib
 import logging
-from datetime import datetime, timezone
-from logging.handlers import RotatingFileHandler
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from functools import wraps
 
-from flask import Flask, request, jsonify
+import httpx
+import orjson
+import zstandard
+import fastjsonschema
+from quart import Quart, Response, request, jsonify
+from quart.json.provider import JSONProvider
+from werkzeug.exceptions import BadRequest
 from dotenv import load_dotenv
-from openai import OpenAI, APIError, RateLimitError, APITimeoutError, AuthenticationError
+from openai import AsyncOpenAI, APIError, RateLimitError, APITimeoutError, AuthenticationError, NotFoundError
+
+import semantic_cache as semantic
+from rate_limit import TokenBucket
 
 # Load configuration
 load_dotenv("config.env")
 
-# Initialize Flask app
-app = Flask(__name__)
+
+def _replace_lone_surrogates(obj):
+    """Return obj with unpaired surrogates in its strings replaced by U+FFFD."""
+    if isinstance(obj, str):
+        return obj.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+    if isinstance(obj, dict):
+        return {_replace_lone_surrogates(k): _replace_lone_surrogates(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_replace_lone_surrogates(v) for v in obj]
+    return obj
+
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson, which encodes straight to bytes in C."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # orjson rejects lone surrogate escapes, which scraped text (e.g. a
+            # cut-off emoji pair) often contains; decode those with json and
+            # replace them, since they can't be encoded as UTF-8 later
+            return _replace_lone_surrogates(json.loads(s))
+
+    def response(self, *args, **kwargs):
+        # Skip the str round-trip of the default implementation
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
+
+
+# Initialize Quart app
+app = Quart(__name__)
+app.json = ORJSONProvider(app)
 app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("MAX_CONTENT_LENGTH", 52428800))
 
-# Initialize OpenAI client
-client = OpenAI(
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", 120))
+API_KEY_CONFIGURED = bool(os.getenv("OPENAI_API_KEY"))
+
+# Shared HTTP connection pool, sized so concurrent requests reuse warm TLS
+# connections instead of queueing on httpx's defaults (100 / 20 keep-alive)
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", 1000)),
+        max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", 1000)),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 300))
+    ),
+    http2=True,
+    timeout=httpx.Timeout(REQUEST_TIMEOUT)
+)
+
+# Initialize OpenAI client (async, so in-flight calls don't pin a worker thread)
+client = AsyncOpenAI(
     api_key=os.getenv("OPENAI_API_KEY"),
     organization=os.getenv("OPENAI_ORG_ID"),
-    timeout=float(os.getenv("REQUEST_TIMEOUT", 120))
+    timeout=REQUEST_TIMEOUT,
+    max_retries=int(os.getenv("OPENAI_MAX_RETRIES", 2)),
+    http_client=http_client
 )
 
+# Optional pacing of model calls under the account's requests-per-minute
+# limit (0 disables); the SDK's retries handle any 429s that still occur and
+# are not paced, so leave headroom below the real limit
+RPM_LIMIT = int(os.getenv("RPM_LIMIT", 0))
+rate_limiter = TokenBucket(RPM_LIMIT) if RPM_LIMIT > 0 else None
+
+
+PRELOAD_OPENAI = os.getenv("PRELOAD_OPENAI", "0") == "1"
+
+
+async def warm_openai_connection():
+    """Open a pooled TLS connection to OpenAI so the first request skips the handshake."""
+    try:
+        await client.models.list()
+        logger.info("OpenAI connection pre-warmed")
+    except Exception as e:
+        logger.warning("Could not pre-warm OpenAI connection - %s", e)
+
+
+@app.before_serving
+async def preload_openai():
+    """Warm the connection pool in the background once the server is up."""
+    if PRELOAD_OPENAI:
+        app.add_background_task(warm_openai_connection)
+
+
+@app.after_serving
+async def close_http_client():
+    """Release pooled connections when the server shuts down."""
+    await http_client.aclose()
+
+
+# Request schemas, compiled once; defaults are filled in during validation
+ANALYZE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "request_id": {"type": "string"},
+        "query": {"type": "string", "default": ""},
+        "sources": {"type": "string", "default": ""},
+        "model": {"type": "string", "default": "gpt-5-nano"},
+        "max_tokens": {"type": "integer", "minimum": 1, "default": 4096},
+        "stream": {"type": "boolean"}
+    },
+    "anyOf": [
+        {"required": ["query"], "properties": {"query": {"minLength": 1}}},
+        {"required": ["sources"], "properties": {"sources": {"minLength": 1}}}
+    ]
+}
+
+CHAT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "request_id": {"type": "string"},
+        "model": {"type": "string", "default": "gpt-5-nano"},
+        "messages": {
+            "type": "array",
+            "minItems": 1,
+            "items": {"type": "object", "required": ["role"]}
+        },
+        "max_tokens": {"type": "integer", "minimum": 1, "default": 4096},
+        "stream": {"type": "boolean"}
+    },
+    "required": ["messages"]
+}
+
+ANALYZE_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "request_id": {"type": "string"},
+        "model": {"type": "string", "default": "gpt-5-nano"},
+        "max_tokens": {"type": "integer", "minimum": 1, "default": 4096},
+        "items": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "request_id": {"type": "string"},
+                    "query": {"type": "string", "default": ""},
+                    "sources": {"type": "string", "default": ""}
+                }
+            }
+        }
+    },
+    "required": ["items"]
+}
+
+_validate_analyze = fastjsonschema.compile(ANALYZE_SCHEMA, use_default=True)
+_validate_chat = fastjsonschema.compile(CHAT_SCHEMA, use_default=True)
+_validate_analyze_batch = fastjsonschema.compile(ANALYZE_BATCH_SCHEMA, use_default=True)
+
+# OpenAI error messages that mean the input exceeded the model's context window
+_CONTEXT_LENGTH_RE = re.compile(r"context_length|maximum", re.IGNORECASE)
+
+# Closing instruction appended to every /analyze prompt
+PROMPT_FOOTER = "Please analyze the above content and provide a comprehensive research summary."
+
+# Exact-match response cache for /analyze (0 disables)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 1024))
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+# In-flight OpenAI calls by cache key, so concurrent identical prompts share one
+_inflight_calls = {}
+
 # Configure logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 LOG_DIR = os.path.join(os.path.dirname(__file__), "logs")
@@ -48,7 +224,6 @@ handler.setFormatter(logging.Formatter(
     "%(asctime)s [%(levelname)s] %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S"
 ))
-logging.getLogger().addHandler(handler)
 logging.getLogger().setLevel(getattr(logging, LOG_LEVEL))
 
 # Also log to console
@@ -57,14 +232,41 @@ console_handler.setFormatter(logging.Formatter(
     "%(asctime)s [%(levelname)s] %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S"
 ))
-logging.getLogger().addHandler(console_handler)
+
+# File and console writes happen on a background thread, so a rotation or
+# slow disk never stalls request handling
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, handler, console_handler, respect_handler_level=True)
+logging.getLogger().addHandler(QueueHandler(log_queue))
+log_listener.start()
+atexit.register(log_listener.stop)
 
 logger = logging.getLogger(__name__)
 
+# Optional semantic cache for paraphrased /analyze prompts
+semantic_cache = None
+if os.getenv("SEMANTIC_CACHE", "0") == "1":
+    if semantic.is_available():
+        semantic_cache = semantic.SemanticCache(
+            cache_dir=os.getenv("SEMANTIC_CACHE_DIR", os.path.join(os.path.dirname(__file__), "cache")),
+            model_name=os.getenv("SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2"),
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.92)),
+            max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", 10000))
+        )
+    else:
+        logger.warning("SEMANTIC_CACHE=1 but sentence-transformers/faiss-cpu are not installed; semantic cache disabled")
+
+
+@app.after_serving
+async def save_semantic_cache():
+    """Write the semantic index snapshot so the next start needn't rebuild it."""
+    if semantic_cache is not None:
+        await asyncio.to_thread(semantic_cache.save)
+
 
 def get_timestamp():
     """Return current UTC timestamp in ISO format."""
-    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
 
 def create_error_response(request_id, error_code, message, recoverable=False, details=None, http_status=500):
@@ -82,116 +284,35 @@ def create_error_response(request_id, error_code, message, recoverable=False, de
     return jsonify(response), http_status
 
 
-def validate_request(f):
-    """Decorator to validate incoming requests."""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not request.is_json:
-            return create_error_response(
-                request_id="unknown",
-                error_code="VALIDATION_ERROR",
-                message="Request must be JSON",
-                http_status=400
-            )
-        return f(*args, **kwargs)
-    return decorated_function
-
-
-@app.route("/health", methods=["GET"])
-def health():
-    """Health check endpoint for Blue Prism connectivity tests."""
-    api_key_configured = bool(os.getenv("OPENAI_API_KEY"))
-
-    return jsonify({
-        "status": "healthy",
-        "version": "1.0.0",
-        "openai_configured": api_key_configured,
-        "timestamp": get_timestamp()
-    })
+class BridgeError(Exception):
+    """An error that is returned to Blue Prism as a standardized error response."""
 
+    def __init__(self, request_id, error_code, message, recoverable=False, details=None, http_status=500):
+        super().__init__(message)
+        self.request_id = request_id
+        self.error_code = error_code
+        self.message = message
+        self.recoverable = recoverable
+        self.details = details
+        self.http_status = http_status
 
-@app.route("/analyze", methods=["POST"])
-@validate_request
-def analyze():
-    """
-    Main endpoint for research analysis.
 
-    Request JSON:
-    {
-        "request_id": "bp-12345",
-        "query": "Research topic",
-        "sources": "Concatenated source content",
-        "model": "gpt-5-nano",  (optional, defaults to gpt-5-nano)
-        "max_tokens": 4096      (optional)
-    }
+@contextmanager
+def openai_errors(request_id, context_message=None):
+    """Translate OpenAI SDK and unexpected errors into BridgeError.
 
-    Response JSON (success):
-    {
-        "request_id": "bp-12345",
-        "success": true,
-        "analysis": "AI-generated analysis...",
-        "tokens_used": 5000,
-        "processing_time_ms": 3500
-    }
+    When context_message is given, API errors that indicate the input was
+    too large are reported as CONTEXT_LENGTH with that message.
     """
-    start_time = time.time()
-    data = request.get_json()
-
-    # Extract fields
-    request_id = data.get("request_id", f"auto-{int(time.time())}")
-    query = data.get("query", "")
-    sources = data.get("sources", "")
-    model = data.get("model", "gpt-5-nano")
-    max_tokens = data.get("max_tokens", 4096)
-
-    # Validate required fields
-    if not query and not sources:
-        logger.warning(f"Request {request_id}: Missing query and sources")
-        return create_error_response(
-            request_id=request_id,
-            error_code="VALIDATION_ERROR",
-            message="At least one of 'query' or 'sources' is required",
-            http_status=400
-        )
-
-    # Build the input prompt
-    input_text = ""
-    if query:
-        input_text += f"Research Query: {query}\n\n"
-    if sources:
-        input_text += f"Source Content:\n{sources}\n\n"
-    input_text += "Please analyze the above content and provide a comprehensive research summary."
-
-    content_length = len(input_text)
-    logger.info(f"Request {request_id}: model={model}, content_length={content_length}")
-
     try:
-        # Call OpenAI Responses API
-        response = client.responses.create(
-            model=model,
-            input=input_text,
-            max_output_tokens=max_tokens
-        )
-
-        analysis = response.output_text
-        tokens_used = getattr(response.usage, "total_tokens", 0) if hasattr(response, "usage") else 0
-
-        processing_time_ms = int((time.time() - start_time) * 1000)
+        yield
 
-        logger.info(f"Request {request_id}: completed, tokens={tokens_used}, time_ms={processing_time_ms}")
-
-        return jsonify({
-            "request_id": request_id,
-            "success": True,
-            "analysis": analysis,
-            "tokens_used": tokens_used,
-            "processing_time_ms": processing_time_ms,
-            "timestamp": get_timestamp()
-        })
+    except BridgeError:
+        raise
 
     except AuthenticationError as e:
-        logger.error(f"Request {request_id}: Authentication failed - {e}")
-        return create_error_response(
+        logger.error("Request %s: Authentication failed - %s", request_id, e)
+        raise BridgeError(
             request_id=request_id,
             error_code="AUTH_ERROR",
             message="Invalid OpenAI API key",
@@ -201,8 +322,8 @@ def analyze():
 
     except RateLimitError as e:
         retry_after = getattr(e, "retry_after", 60)
-        logger.warning(f"Request {request_id}: Rate limited, retry after {retry_after}s")
-        return create_error_response(
+        logger.warning("Request %s: Rate limited, retry after %ss", request_id, retry_after)
+        raise BridgeError(
             request_id=request_id,
             error_code="RATE_LIMIT",
             message=f"Rate limit exceeded. Retry after {retry_after} seconds.",
@@ -212,8 +333,8 @@ def analyze():
         )
 
     except APITimeoutError as e:
-        logger.error(f"Request {request_id}: Timeout - {e}")
-        return create_error_response(
+        logger.error("Request %s: Timeout - %s", request_id, e)
+        raise BridgeError(
             request_id=request_id,
             error_code="TIMEOUT",
             message="Request timed out. Try again with a shorter input.",
@@ -225,19 +346,19 @@ def analyze():
         error_message = str(e)
 
         # Check for context length errors
-        if "context_length" in error_message.lower() or "maximum" in error_message.lower():
-            logger.error(f"Request {request_id}: Context length exceeded - {e}")
-            return create_error_response(
+        if context_message and _CONTEXT_LENGTH_RE.search(error_message):
+            logger.error("Request %s: Context length exceeded - %s", request_id, e)
+            raise BridgeError(
                 request_id=request_id,
                 error_code="CONTEXT_LENGTH",
-                message="Content too large for model. Please reduce the source content size.",
+                message=context_message,
                 recoverable=False,
                 http_status=400
             )
 
         # Generic API error
-        logger.error(f"Request {request_id}: API error - {e}")
-        return create_error_response(
+        logger.error("Request %s: API error - %s", request_id, e)
+        raise BridgeError(
             request_id=request_id,
             error_code="SERVER_ERROR",
             message=f"OpenAI API error: {error_message}",
@@ -246,8 +367,8 @@ def analyze():
         )
 
     except Exception as e:
-        logger.exception(f"Request {request_id}: Unexpected error - {e}")
-        return create_error_response(
+        logger.exception("Request %s: Unexpected error - %s", request_id, e)
+        raise BridgeError(
             request_id=request_id,
             error_code="BRIDGE_ERROR",
             message=f"Internal bridge error: {str(e)}",
@@ -256,9 +377,543 @@ def analyze():
         )
 
 
+def build_input_text(query, sources):
+    """Build the analysis prompt from a research query and source content."""
+    # Joined once so large source payloads are copied a single time
+    parts = []
+    if query:
+        parts += ("Research Query: ", query, "\n\n")
+    if sources:
+        parts += ("Source Content:\n", sources, "\n\n")
+    parts.append(PROMPT_FOOTER)
+    return "".join(parts)
+
+
+def cache_key(model, input_text, max_tokens):
+    """Build the response cache key for a prompt and its generation settings."""
+    digest = hashlib.blake2b(input_text.encode(), digest_size=16).hexdigest()
+    return f"{model}:{max_tokens}:{digest}"
+
+
+def sources_digest(sources):
+    """Digest of the source content, used to match semantic cache entries."""
+    return hashlib.blake2b(sources.encode(), digest_size=16).hexdigest()
+
+
+def cache_get(key):
+    """Return the cached (analysis, tokens_used) for key, or None on a miss."""
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is not None:
+            _response_cache.move_to_end(key)
+        return entry
+
+
+def cache_put(key, entry):
+    """Store (analysis, tokens_used), evicting the least recently used entry."""
+    if RESPONSE_CACHE_SIZE <= 0:
+        return
+    with _response_cache_lock:
+        _response_cache[key] = entry
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+
+async def pace_request():
+    """Wait for the rate limiter, if one is configured, before a model call."""
+    if rate_limiter is not None:
+        await rate_limiter.acquire()
+
+
+def _extract_usage(response):
+    """Return total_tokens from an OpenAI response, or 0 if usage is missing."""
+    try:
+        return response.usage.total_tokens or 0
+    except AttributeError:
+        return 0
+
+
+async def _create_response(model, input_text, max_tokens):
+    """Call the Responses API and return (analysis, tokens_used)."""
+    await pace_request()
+    response = await client.responses.create(
+        model=model,
+        input=input_text,
+        max_output_tokens=max_tokens
+    )
+
+    analysis = response.output_text
+    tokens_used = _extract_usage(response)
+    return analysis, tokens_used
+
+
+async def store_semantic_entry(vector, model, max_tokens, digest, analysis, tokens_used):
+    """Add an answer to the semantic cache, logging rather than raising on failure."""
+    try:
+        await asyncio.to_thread(semantic_cache.add, vector, model, max_tokens, digest, analysis, tokens_used)
+    except Exception as e:
+        logger.warning("Could not store semantic cache entry - %s", e)
+
+
+async def _create_and_store(key, model, input_text, max_tokens, vector, digest):
+    """Call the Responses API and store the result in the caches."""
+    analysis, tokens_used = await _create_response(model, input_text, max_tokens)
+
+    cache_put(key, (analysis, tokens_used))
+    if vector is not None:
+        # Persisting can wait on a log rewrite or index snapshot, so don't
+        # hold the response for it
+        app.add_background_task(store_semantic_entry, vector, model, max_tokens, digest, analysis, tokens_used)
+    return analysis, tokens_used
+
+
+async def _shared_create_response(key, model, input_text, max_tokens, vector=None, digest=None):
+    """Join the in-flight call for key, or start one if there is none.
+
+    Only the task that makes the call writes to the caches, so requests
+    that join it don't store duplicate entries.
+    """
+    task = _inflight_calls.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_create_and_store(key, model, input_text, max_tokens, vector, digest))
+        _inflight_calls[key] = task
+        task.add_done_callback(lambda _: _inflight_calls.pop(key, None))
+
+    # Shield so one caller disconnecting doesn't cancel the call for the rest
+    return await asyncio.shield(task)
+
+
+async def _do_openai_call(model, input_text, max_tokens, query="", sources=""):
+    """Call the Responses API, serving repeated prompts from the caches.
+
+    query and sources are the parts input_text was built from; the semantic
+    cache matches on the query and requires identical sources.
+
+    Returns (analysis, tokens_used, cache_type) where cache_type is "exact",
+    "semantic" or None when OpenAI was called.
+    """
+    key = cache_key(model, input_text, max_tokens)
+    entry = cache_get(key)
+    if entry is not None:
+        return entry + ("exact",)
+
+    # Embedding is CPU-bound, so keep it off the event loop
+    vector = digest = None
+    if semantic_cache is not None and query:
+        digest = sources_digest(sources)
+        # The semantic cache is optional; if it fails, just call OpenAI
+        try:
+            vector = await asyncio.to_thread(semantic_cache.embed, query)
+            entry = await asyncio.to_thread(semantic_cache.lookup, vector, model, max_tokens, digest)
+        except Exception as e:
+            logger.warning("Semantic cache lookup failed - %s", e)
+            vector = entry = None
+        if entry is not None:
+            cache_put(key, entry)
+            return entry + ("semantic",)
+
+    analysis, tokens_used = await _shared_create_response(key, model, input_text, max_tokens, vector, digest)
+    return analysis, tokens_used, None
+
+
+def wants_stream(data):
+    """Return True if the caller asked for a text/event-stream response."""
+    return data.get("stream") is True or request.args.get("stream", "").lower() == "true"
+
+
+def sse_event(payload):
+    """Format a payload as a server-sent event frame."""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+def sse_response(events):
+    """Wrap an async generator of SSE frames in a text/event-stream Response."""
+    response = Response(events, mimetype="text/event-stream")
+    # Quart's RESPONSE_TIMEOUT covers the whole body send and would cut a
+    # long stream off silently; OpenAI's own timeouts bound each event instead
+    response.timeout = None
+    return response
+
+
+async def stream_analysis(request_id, model, input_text, max_tokens, start_ns):
+    """Stream an /analyze result as server-sent events.
+
+    The OpenAI request is opened before the response is returned, so
+    connection and API errors still reach the endpoint's error handling.
+    start_ns is the request's time.perf_counter_ns() start mark.
+    """
+    key = cache_key(model, input_text, max_tokens)
+    entry = cache_get(key)
+    events = None
+    if entry is None:
+        await pace_request()
+        events = await client.responses.create(
+            model=model,
+            input=input_text,
+            max_output_tokens=max_tokens,
+            stream=True
+        )
+
+    async def generate():
+        if entry is not None:
+            analysis, tokens_used = entry
+            yield sse_event({"delta": analysis})
+        else:
+            parts = []
+            tokens_used = 0
+            # The context manager closes the upstream stream when the client
+            # disconnects or the request is cancelled
+            try:
+                async with events:
+                    async for event in events:
+                        if event.type == "response.output_text.delta":
+                            parts.append(event.delta)
+                            yield sse_event({"delta": event.delta})
+                        elif event.type in ("response.completed", "response.incomplete"):
+                            tokens_used = _extract_usage(event.response)
+                        elif event.type in ("response.failed", "error"):
+                            raise RuntimeError(f"OpenAI reported {event.type}")
+            except Exception as e:
+                logger.error("Request %s: stream interrupted - %s", request_id, e)
+                yield sse_event({
+                    "done": True,
+                    "success": False,
+                    "error_code": "SERVER_ERROR",
+                    "error_message": f"Stream interrupted: {str(e)}",
+                    "recoverable": True
+                })
+                return
+            cache_put(key, ("".join(parts), tokens_used))
+
+        processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+        logger.info("Request %s: stream completed, tokens=%s, time_ms=%s, cache_hit=%s", request_id, tokens_used, processing_time_ms, entry is not None)
+
+        yield sse_event({
+            "done": True,
+            "success": True,
+            "request_id": request_id,
+            "tokens_used": tokens_used,
+            "cache_hit": entry is not None,
+            "processing_time_ms": processing_time_ms
+        })
+
+    return sse_response(generate())
+
+
+async def stream_chat(request_id, model, messages, max_tokens, start_ns):
+    """Stream a /chat completion as server-sent events."""
+    await pace_request()
+    chunks = await client.chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        stream=True,
+        stream_options={"include_usage": True}
+    )
+
+    async def generate():
+        tokens_used = 0
+        finish_reason = None
+        try:
+            async with chunks:
+                async for chunk in chunks:
+                    if chunk.usage:
+                        tokens_used = _extract_usage(chunk)
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    if choice.finish_reason:
+                        finish_reason = choice.finish_reason
+                    if choice.delta and choice.delta.content:
+                        yield sse_event({"delta": choice.delta.content})
+        except Exception as e:
+            logger.error("Request %s: stream interrupted - %s", request_id, e)
+            yield sse_event({
+                "done": True,
+                "success": False,
+                "error_code": "SERVER_ERROR",
+                "error_message": f"Stream interrupted: {str(e)}",
+                "recoverable": True
+            })
+            return
+
+        processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+        logger.info("Request %s: stream completed, tokens=%s, time_ms=%s", request_id, tokens_used, processing_time_ms)
+
+        yield sse_event({
+            "done": True,
+            "success": True,
+            "request_id": request_id,
+            "tokens_used": tokens_used,
+            "finish_reason": finish_reason,
+            "processing_time_ms": processing_time_ms
+        })
+
+    return sse_response(generate())
+
+
+# Compressed bytes fed to the zstd decoder per step; a zstd block expands at
+# most ~32000x, so one step can overshoot the size limit by at most ~32MB
+ZSTD_INPUT_SLICE = 1024
+
+
+def decompress_body(raw, encoding, limit):
+    """Decode a gzip or zstd request body, stopping just past limit bytes."""
+    if not raw:
+        return b""
+
+    chunks = []
+    total = 0
+    if encoding == "gzip":
+        with gzip.GzipFile(fileobj=io.BytesIO(raw)) as reader:
+            while total <= limit:
+                chunk = reader.read(min(1024 * 1024, limit + 1 - total))
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                total += len(chunk)
+        return b"".join(chunks)
+
+    # zstd's stream reader returns short output for a truncated frame instead
+    # of raising, so decode incrementally and check the last frame was
+    # completed. Small input slices bound how far one step can expand past
+    # limit. A body may hold several frames, each needing a fresh decoder.
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    pos = 0
+    while total <= limit and pos < len(raw):
+        if decompressor.eof:
+            decompressor = zstandard.ZstdDecompressor().decompressobj()
+        piece = raw[pos:pos + ZSTD_INPUT_SLICE]
+        chunk = decompressor.decompress(piece)
+        pos += len(piece)
+        if decompressor.eof:
+            # Bytes fed past the end of this frame belong to the next one
+            pos -= len(decompressor.unused_data)
+        chunks.append(chunk)
+        total += len(chunk)
+    if total <= limit and not decompressor.eof:
+        raise zstandard.ZstdError("truncated zstd frame")
+    return b"".join(chunks)
+
+
+@app.before_request
+async def decode_content_encoding():
+    """Transparently decompress bodies sent with Content-Encoding gzip or zstd."""
+    encoding = request.headers.get("Content-Encoding", "").strip().lower()
+    if not encoding or encoding == "identity":
+        return None
+
+    if encoding not in ("gzip", "zstd"):
+        return create_error_response(
+            request_id="unknown",
+            error_code="UNSUPPORTED_ENCODING",
+            message=f"Unsupported Content-Encoding '{encoding}'. Use gzip or zstd.",
+            http_status=415
+        )
+
+    limit = app.config["MAX_CONTENT_LENGTH"]
+    raw = await request.get_data(cache=False)
+    try:
+        # Decompression is CPU-bound, so keep it off the event loop
+        data = await asyncio.to_thread(decompress_body, raw, encoding, limit)
+    except (OSError, EOFError, zlib.error, zstandard.ZstdError) as e:
+        logger.warning("Could not decompress %s request body - %s", encoding, e)
+        return create_error_response(
+            request_id="unknown",
+            error_code="VALIDATION_ERROR",
+            message=f"Request body is not valid {encoding} data",
+            http_status=400
+        )
+
+    # Swap in the decoded body; the size limit now applies to the decompressed JSON
+    body = request.body_class(None, limit)
+    body.set_result(data)
+    request.body = body
+    return None
+
+
+def schema_error_response(data, error, summary):
+    """Turn a schema validation failure into a VALIDATION_ERROR response.
+
+    Missing or empty top-level fields use the endpoint's summary message and
+    a body that isn't an object says so; everything else, including missing
+    fields inside items, names the offending field. A request_id that isn't
+    a string is not echoed back.
+    """
+    request_id = data.get("request_id") if isinstance(data, dict) else None
+    if not isinstance(request_id, str):
+        request_id = "unknown"
+    top_level = error.path == ["data"] or (error.rule == "minItems" and len(error.path) == 2)
+    if top_level and error.rule in ("anyOf", "required", "minItems"):
+        message = summary
+    elif error.path == ["data"] and error.rule == "type":
+        message = "Request body must be a JSON object"
+    else:
+        message = error.message.replace("data.", "", 1)
+
+    logger.warning("Request %s: Invalid request - %s", request_id, error.message)
+    return create_error_response(
+        request_id=request_id,
+        error_code="VALIDATION_ERROR",
+        message=message,
+        http_status=400
+    )
+
+
+def validate_request(f):
+    """Decorator to validate incoming requests."""
+    @wraps(f)
+    async def decorated_function(*args, **kwargs):
+        if not request.is_json:
+            return create_error_response(
+                request_id="unknown",
+                error_code="VALIDATION_ERROR",
+                message="Request must be JSON",
+                http_status=400
+            )
+
+        # Parse once here (the result is cached for the endpoint) so a
+        # malformed body is a validation error rather than a 500
+        try:
+            await request.get_json()
+        except (BadRequest, UnicodeDecodeError) as e:
+            logger.warning("Malformed JSON request body - %s", e)
+            return create_error_response(
+                request_id="unknown",
+                error_code="VALIDATION_ERROR",
+                message="Request body is not valid JSON",
+                http_status=400
+            )
+        return await f(*args, **kwargs)
+    return decorated_function
+
+
+def static_prefix(payload):
+    """Serialize a fixed payload once, leaving the object open for a timestamp."""
+    return orjson.dumps(payload)[:-1]
+
+
+def static_json_response(prefix, http_status=200):
+    """Close a static_prefix() body with the current timestamp and return it."""
+    body = b"".join((prefix, b',"timestamp":"', get_timestamp().encode(), b'"}'))
+    return Response(body, status=http_status, mimetype="application/json")
+
+
+def format_size(num_bytes):
+    """Format a byte count exactly, in MB or KB when it divides evenly."""
+    for unit, size in (("MB", 1024 * 1024), ("KB", 1024)):
+        if num_bytes >= size and num_bytes % size == 0:
+            return f"{num_bytes // size}{unit}"
+    return f"{num_bytes} bytes"
+
+
+# Responses whose content never changes are serialized once at startup
+_HEALTH_PREFIX = static_prefix({
+    "status": "healthy",
+    "version": "1.0.0",
+    "openai_configured": API_KEY_CONFIGURED
+})
+
+_PAYLOAD_TOO_LARGE_PREFIX = static_prefix({
+    "request_id": "unknown",
+    "success": False,
+    "error_code": "PAYLOAD_TOO_LARGE",
+    "error_message": f"Request body exceeds maximum allowed size ({format_size(app.config['MAX_CONTENT_LENGTH'])})",
+    "recoverable": False
+})
+
+_INTERNAL_ERROR_PREFIX = static_prefix({
+    "request_id": "unknown",
+    "success": False,
+    "error_code": "INTERNAL_ERROR",
+    "error_message": "An unexpected error occurred",
+    "recoverable": False
+})
+
+
+@app.route("/health", methods=["GET"])
+async def health():
+    """Health check endpoint for Blue Prism connectivity tests."""
+    return static_json_response(_HEALTH_PREFIX)
+
+
+@app.route("/analyze", methods=["POST"])
+@validate_request
+async def analyze():
+    """
+    Main endpoint for research analysis.
+
+    Request JSON:
+    {
+        "request_id": "bp-12345",
+        "query": "Research topic",
+        "sources": "Concatenated source content",
+        "model": "gpt-5-nano",  (optional, defaults to gpt-5-nano)
+        "max_tokens": 4096,     (optional)
+        "stream": true          (optional, or ?stream=true; returns text/event-stream)
+    }
+
+    Response JSON (success):
+    {
+        "request_id": "bp-12345",
+        "success": true,
+        "analysis": "AI-generated analysis...",
+        "tokens_used": 5000,
+        "cache_hit": false,
+        "cache_type": null,    ("exact" or "semantic" on a hit)
+        "processing_time_ms": 3500
+    }
+    """
+    start_ns = time.perf_counter_ns()
+    data = await request.get_json()
+
+    # Validate fields and fill in defaults
+    try:
+        data = _validate_analyze(data)
+    except fastjsonschema.JsonSchemaValueException as e:
+        return schema_error_response(data, e, "At least one of 'query' or 'sources' is required")
+
+    request_id = data.get("request_id") or f"auto-{int(time.time())}"
+    query = data["query"]
+    sources = data["sources"]
+    model = data["model"]
+    # fastjsonschema's "integer" also accepts whole floats such as 5.0
+    max_tokens = int(data["max_tokens"])
+
+    # Build the input prompt
+    input_text = build_input_text(query, sources)
+
+    content_length = len(input_text)
+    logger.info("Request %s: model=%s, content_length=%s", request_id, model, content_length)
+
+    with openai_errors(request_id, context_message="Content too large for model. Please reduce the source content size."):
+        if wants_stream(data):
+            return await stream_analysis(request_id, model, input_text, max_tokens, start_ns)
+
+        # Call OpenAI Responses API (or reuse the answer to an identical prompt)
+        analysis, tokens_used, cache_type = await _do_openai_call(model, input_text, max_tokens, query, sources)
+        cache_hit = cache_type is not None
+
+        processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+
+        logger.info("Request %s: completed, tokens=%s, time_ms=%s, cache=%s", request_id, tokens_used, processing_time_ms, cache_type)
+
+        return jsonify({
+            "request_id": request_id,
+            "success": True,
+            "analysis": analysis,
+            "tokens_used": tokens_used,
+            "cache_hit": cache_hit,
+            "cache_type": cache_type,
+            "processing_time_ms": processing_time_ms,
+            "timestamp": get_timestamp()
+        })
+
+
 @app.route("/chat", methods=["POST"])
 @validate_request
-def chat():
+async def chat():
     """
     Alternative endpoint using Chat Completions API format.
     Use this if you need more control over the conversation.
@@ -271,42 +926,44 @@ def chat():
             {"role": "system", "content": "You are a research assistant."},
             {"role": "user", "content": "Analyze this content..."}
         ],
-        "max_tokens": 4096
+        "max_tokens": 4096,
+        "stream": true          (optional, or ?stream=true; returns text/event-stream)
     }
     """
-    start_time = time.time()
-    data = request.get_json()
+    start_ns = time.perf_counter_ns()
+    data = await request.get_json()
 
-    request_id = data.get("request_id", f"auto-{int(time.time())}")
-    model = data.get("model", "gpt-5-nano")
-    messages = data.get("messages", [])
-    max_tokens = data.get("max_tokens", 4096)
+    try:
+        data = _validate_chat(data)
+    except fastjsonschema.JsonSchemaValueException as e:
+        return schema_error_response(data, e, "'messages' array is required")
 
-    if not messages:
-        return create_error_response(
-            request_id=request_id,
-            error_code="VALIDATION_ERROR",
-            message="'messages' array is required",
-            http_status=400
-        )
+    request_id = data.get("request_id") or f"auto-{int(time.time())}"
+    model = data["model"]
+    messages = data["messages"]
+    max_tokens = int(data["max_tokens"])
 
-    logger.info(f"Request {request_id}: chat endpoint, model={model}, messages={len(messages)}")
+    logger.info("Request %s: chat endpoint, model=%s, messages=%s", request_id, model, len(messages))
+
+    with openai_errors(request_id, context_message="Content too large for model. Please shorten the messages."):
+        if wants_stream(data):
+            return await stream_chat(request_id, model, messages, max_tokens, start_ns)
 
-    try:
         # Use Chat Completions API
-        response = client.chat.completions.create(
+        await pace_request()
+        response = await client.chat.completions.create(
             model=model,
             messages=messages,
             max_tokens=max_tokens
         )
 
         content = response.choices[0].message.content
-        tokens_used = response.usage.total_tokens if response.usage else 0
+        tokens_used = _extract_usage(response)
         finish_reason = response.choices[0].finish_reason
 
-        processing_time_ms = int((time.time() - start_time) * 1000)
+        processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
 
-        logger.info(f"Request {request_id}: completed, tokens={tokens_used}, time_ms={processing_time_ms}")
+        logger.info("Request %s: completed, tokens=%s, time_ms=%s", request_id, tokens_used, processing_time_ms)
 
         return jsonify({
             "request_id": request_id,
@@ -318,90 +975,245 @@ def chat():
             "timestamp": get_timestamp()
         })
 
-    except AuthenticationError as e:
-        logger.error(f"Request {request_id}: Authentication failed - {e}")
-        return create_error_response(
-            request_id=request_id,
-            error_code="AUTH_ERROR",
-            message="Invalid OpenAI API key",
-            recoverable=False,
-            http_status=401
-        )
 
-    except RateLimitError as e:
-        retry_after = getattr(e, "retry_after", 60)
-        logger.warning(f"Request {request_id}: Rate limited, retry after {retry_after}s")
-        return create_error_response(
-            request_id=request_id,
-            error_code="RATE_LIMIT",
-            message=f"Rate limit exceeded. Retry after {retry_after} seconds.",
-            recoverable=True,
-            details={"retry_after_seconds": retry_after},
-            http_status=429
-        )
+# Batch statuses after which no more results will appear
+BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
 
-    except APITimeoutError as e:
-        logger.error(f"Request {request_id}: Timeout - {e}")
-        return create_error_response(
-            request_id=request_id,
-            error_code="TIMEOUT",
-            message="Request timed out. Try again with a shorter input.",
-            recoverable=True,
-            http_status=504
-        )
 
-    except APIError as e:
-        logger.error(f"Request {request_id}: API error - {e}")
-        return create_error_response(
-            request_id=request_id,
-            error_code="SERVER_ERROR",
-            message=f"OpenAI API error: {str(e)}",
-            recoverable=True,
-            http_status=502
-        )
+def batch_output_text(body):
+    """Extract the output text from a raw Responses API body in a batch result."""
+    parts = []
+    for item in body.get("output", []):
+        if item.get("type") != "message":
+            continue
+        for content in item.get("content", []):
+            if content.get("type") == "output_text":
+                parts.append(content.get("text", ""))
+    return "".join(parts)
 
-    except Exception as e:
-        logger.exception(f"Request {request_id}: Unexpected error - {e}")
-        return create_error_response(
-            request_id=request_id,
-            error_code="BRIDGE_ERROR",
-            message=f"Internal bridge error: {str(e)}",
-            recoverable=False,
-            http_status=500
+
+@app.route("/analyze_batch", methods=["POST"])
+@validate_request
+async def analyze_batch():
+    """
+    Submit many analyses to the OpenAI Batch API (50% cheaper, up to 24h turnaround).
+    Use this for long-running Blue Prism jobs that don't need an immediate answer.
+
+    Request JSON:
+    {
+        "request_id": "bp-batch-1",
+        "model": "gpt-5-nano",  (optional, defaults to gpt-5-nano)
+        "max_tokens": 4096,     (optional)
+        "items": [
+            {"request_id": "bp-1", "query": "Research topic", "sources": "..."},
+            {"request_id": "bp-2", "query": "Another topic"}
+        ]
+    }
+
+    Response JSON (success):
+    {
+        "request_id": "bp-batch-1",
+        "success": true,
+        "batch_id": "batch_abc123",
+        "status": "validating",
+        "item_count": 2
+    }
+    """
+    data = await request.get_json()
+
+    try:
+        data = _validate_analyze_batch(data)
+    except fastjsonschema.JsonSchemaValueException as e:
+        return schema_error_response(data, e, "'items' array is required")
+
+    request_id = data.get("request_id") or f"auto-{int(time.time())}"
+    model = data["model"]
+    max_tokens = int(data["max_tokens"])
+    items = data["items"]
+
+    # One JSONL line per item, keyed by the item's request_id
+    lines = []
+    custom_ids = set()
+    for index, item in enumerate(items):
+        custom_id = item.get("request_id") or f"item-{index}"
+        query = item["query"]
+        sources = item["sources"]
+
+        if not query and not sources:
+            return create_error_response(
+                request_id=request_id,
+                error_code="VALIDATION_ERROR",
+                message=f"Item '{custom_id}': at least one of 'query' or 'sources' is required",
+                http_status=400
+            )
+        if custom_id in custom_ids:
+            return create_error_response(
+                request_id=request_id,
+                error_code="VALIDATION_ERROR",
+                message=f"Duplicate item request_id '{custom_id}'",
+                http_status=400
+            )
+        custom_ids.add(custom_id)
+
+        lines.append(orjson.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/responses",
+            "body": {
+                "model": model,
+                "input": build_input_text(query, sources),
+                "max_output_tokens": max_tokens
+            }
+        }))
+
+    logger.info("Request %s: batch submit, model=%s, items=%s", request_id, model, len(lines))
+
+    with openai_errors(request_id):
+        batch_file = await client.files.create(
+            file=(f"{request_id}.jsonl", b"\n".join(lines)),
+            purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/responses",
+            completion_window="24h"
         )
 
+        logger.info("Request %s: batch submitted, batch_id=%s", request_id, batch.id)
 
-@app.errorhandler(413)
-def request_entity_too_large(error):
-    """Handle requests that exceed MAX_CONTENT_LENGTH."""
+        return jsonify({
+            "request_id": request_id,
+            "success": True,
+            "batch_id": batch.id,
+            "status": batch.status,
+            "item_count": len(lines),
+            "timestamp": get_timestamp()
+        })
+
+
+@app.route("/batch_result/<batch_id>", methods=["GET"])
+async def batch_result(batch_id):
+    """
+    Poll a batch submitted via /analyze_batch.
+
+    Response JSON (still running):
+    {
+        "batch_id": "batch_abc123",
+        "success": true,
+        "status": "in_progress",
+        "finished": false
+    }
+
+    Response JSON (finished - status is completed, failed, expired or cancelled):
+    {
+        "batch_id": "batch_abc123",
+        "success": true,        (false when status is failed)
+        "status": "completed",
+        "finished": true,
+        "results": [
+            {"request_id": "bp-1", "success": true, "analysis": "...", "tokens_used": 5000},
+            {"request_id": "bp-2", "success": false, "error_message": "..."}
+        ],
+        "errors": [             (batch-level errors, e.g. a rejected input file)
+            {"code": "...", "message": "...", "line": 3}
+        ]
+    }
+    """
+    with openai_errors(batch_id):
+        try:
+            batch = await client.batches.retrieve(batch_id)
+        except NotFoundError as e:
+            logger.warning("Batch %s: not found - %s", batch_id, e)
+            raise BridgeError(
+                request_id=batch_id,
+                error_code="BATCH_NOT_FOUND",
+                message=f"Unknown batch_id '{batch_id}'",
+                http_status=404
+            )
+
+        response = {
+            "batch_id": batch_id,
+            "success": True,
+            "status": batch.status,
+            "finished": batch.status in BATCH_FINAL_STATUSES,
+            "timestamp": get_timestamp()
+        }
+        if not response["finished"]:
+            return jsonify(response)
+
+        results = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await client.files.content(file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                record = orjson.loads(line)
+                result = record.get("response") or {}
+                body = result.get("body") or {}
+
+                if result.get("status_code") == 200:
+                    results.append({
+                        "request_id": record["custom_id"],
+                        "success": True,
+                        "analysis": batch_output_text(body),
+                        "tokens_used": (body.get("usage") or {}).get("total_tokens", 0)
+                    })
+                else:
+                    error = record.get("error") or body.get("error") or {}
+                    results.append({
+                        "request_id": record["custom_id"],
+                        "success": False,
+                        "error_message": error.get("message", "Batch request failed")
+                    })
+
+        # A batch that fails validation has no output files, only these
+        errors = [
+            {"code": error.code, "message": error.message, "line": error.line}
+            for error in ((batch.errors.data or []) if batch.errors else [])
+        ]
+
+        logger.info("Batch %s: %s, results=%s, errors=%s", batch_id, batch.status, len(results), len(errors))
+
+        response["success"] = batch.status != "failed"
+        response["results"] = results
+        response["errors"] = errors
+        return jsonify(response)
+
+
+@app.errorhandler(BridgeError)
+async def handle_bridge_error(error):
+    """Return a BridgeError raised by a handler as a standardized error response."""
     return create_error_response(
-        request_id="unknown",
-        error_code="PAYLOAD_TOO_LARGE",
-        message="Request body exceeds maximum allowed size (50MB)",
-        recoverable=False,
-        http_status=413
+        request_id=error.request_id,
+        error_code=error.error_code,
+        message=error.message,
+        recoverable=error.recoverable,
+        details=error.details,
+        http_status=error.http_status
     )
 
 
+@app.errorhandler(413)
+async def request_entity_too_large(error):
+    """Handle requests that exceed MAX_CONTENT_LENGTH."""
+    return static_json_response(_PAYLOAD_TOO_LARGE_PREFIX, http_status=413)
+
+
 @app.errorhandler(Exception)
-def handle_exception(e):
+async def handle_exception(e):
     """Global exception handler."""
-    logger.exception(f"Unhandled exception: {e}")
-    return create_error_response(
-        request_id="unknown",
-        error_code="INTERNAL_ERROR",
-        message="An unexpected error occurred",
-        recoverable=False,
-        http_status=500
-    )
+    logger.exception("Unhandled exception: %s", e)
+    return static_json_response(_INTERNAL_ERROR_PREFIX, http_status=500)
 
 
 if __name__ == "__main__":
     host = os.getenv("BRIDGE_HOST", "127.0.0.1")
     port = int(os.getenv("BRIDGE_PORT", 5050))
 
-    logger.info(f"Starting Blue Prism OpenAI Bridge on {host}:{port}")
+    logger.info("Starting Blue Prism OpenAI Bridge on %s:%s", host, port)
 
-    # Use Flask's built-in server for development
-    # For production, use: waitress-serve --host=127.0.0.1 --port=5050 app:app
+    # Use Quart's built-in server for development
+    # For production, use: hypercorn --config hypercorn.toml app:app
     app.run(host=host, port=port, debug=False)
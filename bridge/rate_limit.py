@@ -0,0 +1,41 @@
+"""
+In-process request pacing for OpenAI calls.
+
+A token bucket holding up to rate_per_minute tokens, refilled continuously at
+rate_per_minute / 60 tokens per second. Each OpenAI call takes one token and
+waits for a refill when the bucket is empty. Bursts from Blue Prism are
+smoothed under the account's RPM limit instead of being rejected with 429s.
+
+Only the first attempt of a call takes a token: the OpenAI SDK retries 429s,
+timeouts and 5xx errors internally, below this layer, and those retries are
+not paced.
+"""
+
+import time
+import asyncio
+
+
+class TokenBucket:
+    """Async token bucket; call `await bucket.acquire()` before each request."""
+
+    def __init__(self, rate_per_minute):
+        self.capacity = rate_per_minute
+        self.interval = 60.0 / rate_per_minute
+        self.tokens = float(rate_per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.interval)
+        self.updated = now
+
+    async def acquire(self):
+        """Take one token, sleeping until one is available."""
+        # Check and take run without an await in between, so no lock is
+        # needed on a single event loop
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) * self.interval)
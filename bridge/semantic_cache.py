@@ -0,0 +1,242 @@
+"""
+Semantic response cache for near-duplicate /analyze prompts.
+
+Embeds each research query with a sentence-transformers model and looks up
+the closest previously answered query in a FAISS inner-product index. When
+the cosine similarity clears the threshold and the source content is
+identical (compared by digest), the stored analysis is reused and the OpenAI
+call is skipped. Only the query is embedded: the model truncates long input,
+so embedding the sources would make any two requests with the same opening
+paragraph look identical.
+
+Entries (with their embeddings and the name of the model that produced
+them) are appended to a JSONL log, which is the source of truth. The FAISS
+index is only a snapshot, written every SAVE_EVERY additions and at shutdown,
+and is topped up or rebuilt from the log on load if it is behind or
+inconsistent. Entries from a different embedding model are discarded on load,
+and the oldest entries are dropped once the cache outgrows max_entries.
+
+The cache directory belongs to a single process: a second writer's log
+rewrite would drop the first one's appends and misalign its index.
+
+Optional: requires `sentence-transformers` and `faiss-cpu`. Enable with
+SEMANTIC_CACHE=1 in config.env.
+"""
+
+import os
+import json
+import logging
+import threading
+
+try:
+    import faiss
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    faiss = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # pragma: no cover - optional dependency
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "semantic.index"
+ENTRIES_FILE = "semantic_entries.jsonl"
+
+# Neighbours inspected per lookup, so a close query answered for different
+# sources, model or max_tokens doesn't hide a usable match
+SEARCH_K = 4
+
+# Additions between index snapshots
+SAVE_EVERY = 100
+
+# Fraction of max_entries the cache may overshoot before the oldest entries
+# are dropped, so the log and index are rewritten in batches, not per add
+COMPACT_SLACK = 0.1
+
+
+def is_available():
+    """Return True if the optional semantic cache dependencies are installed."""
+    return faiss is not None and SentenceTransformer is not None
+
+
+class SemanticCache:
+    """FAISS-backed nearest-query cache persisted to a directory.
+
+    encoder defaults to a SentenceTransformer loaded from model_name; any
+    object with encode() and get_sentence_embedding_dimension() works.
+    """
+
+    def __init__(self, cache_dir, model_name="all-MiniLM-L6-v2", threshold=0.92, max_entries=10000,
+                 encoder=None):
+        if faiss is None or (encoder is None and SentenceTransformer is None):
+            raise RuntimeError("Semantic cache requires sentence-transformers and faiss-cpu")
+        if max_entries < 1:
+            raise ValueError(f"Semantic cache max_entries must be at least 1, got {max_entries}")
+
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.encoder = encoder if encoder is not None else SentenceTransformer(model_name)
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+        self.entries_path = os.path.join(cache_dir, ENTRIES_FILE)
+
+        # lock guards the in-memory index/entries and is held only briefly;
+        # write_lock serializes additions so the log and index stay in order
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.unsaved = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        dimension = self.encoder.get_sentence_embedding_dimension()
+        records = []
+        stale = 0
+        if os.path.exists(self.entries_path):
+            with open(self.entries_path, "rb+") as f:
+                good = 0
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    good += len(line)
+
+                    # Vectors from another model (or older entries without
+                    # one) aren't comparable with this encoder's embeddings
+                    vector = entry.pop("vector", None)
+                    if entry.pop("encoder", None) != self.model_name or vector is None or len(vector) != dimension:
+                        stale += 1
+                        continue
+                    records.append((entry, vector))
+
+                # A crash mid-append leaves a partial last line; drop it so
+                # the next append starts on a clean line
+                if f.tell() != good:
+                    logger.warning("Semantic cache truncating unreadable tail of %s", self.entries_path)
+                    f.truncate(good)
+
+        dropped = stale + max(0, len(records) - self.max_entries)
+        records = records[-self.max_entries:]
+        self.entries = [entry for entry, _ in records]
+
+        index = None
+        if dropped:
+            logger.info("Semantic cache discarding %s entries (other embedding model or over size limit)", dropped)
+            self._write_log(records)
+        elif os.path.exists(self.index_path):
+            try:
+                index = faiss.read_index(self.index_path)
+            except RuntimeError as e:
+                logger.warning("Semantic cache index unreadable, rebuilding - %s", e)
+
+        if index is None or index.d != dimension or index.ntotal > len(self.entries):
+            index = faiss.IndexFlatIP(dimension)
+        if index.ntotal < len(self.entries):
+            index.add(np.asarray([vector for _, vector in records[index.ntotal:]], dtype="float32"))
+            self.unsaved = len(self.entries)
+
+        self.index = index
+        if self.entries:
+            logger.info("Semantic cache loaded %s entries from %s", len(self.entries), self.cache_dir)
+
+    def _log_line(self, entry, vector):
+        return json.dumps(dict(entry, encoder=self.model_name, vector=list(vector)))
+
+    def _write_log(self, records):
+        """Replace the log with records, a list of (entry, vector) pairs.
+
+        The index snapshot is deleted first: it was built from the old log,
+        and a crash before the next snapshot would otherwise load it against
+        the new one with its vectors shifted.
+        """
+        if os.path.exists(self.index_path):
+            os.remove(self.index_path)
+        tmp_path = self.entries_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry, vector in records:
+                f.write(self._log_line(entry, vector) + "\n")
+        os.replace(tmp_path, self.entries_path)
+
+    def embed(self, text):
+        """Return the normalized embedding of text as a (1, dim) float32 array."""
+        vector = self.encoder.encode([text], normalize_embeddings=True)
+        return np.asarray(vector, dtype="float32")
+
+    def lookup(self, vector, model, max_tokens, sources_digest):
+        """Return (analysis, tokens_used) of the closest matching query, or None."""
+        with self.lock:
+            if self.index.ntotal == 0:
+                return None
+            scores, ids = self.index.search(vector, min(SEARCH_K, self.index.ntotal))
+
+            for score, idx in zip(scores[0], ids[0]):
+                if idx < 0 or score < self.threshold:
+                    break
+                entry = self.entries[idx]
+                if (entry["model"] == model and entry["max_tokens"] == max_tokens
+                        and entry["sources_digest"] == sources_digest):
+                    return entry["analysis"], entry["tokens_used"]
+        return None
+
+    def add(self, vector, model, max_tokens, sources_digest, analysis, tokens_used):
+        """Store an answered query, appending it to the log before indexing it."""
+        entry = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "sources_digest": sources_digest,
+            "analysis": analysis,
+            "tokens_used": tokens_used
+        }
+        line = self._log_line(entry, vector[0].tolist())
+
+        with self.write_lock:
+            with open(self.entries_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+            with self.lock:
+                self.index.add(vector)
+                self.entries.append(entry)
+            self.unsaved += 1
+
+            if len(self.entries) > self.max_entries * (1 + COMPACT_SLACK):
+                self._compact()
+            elif self.unsaved >= SAVE_EVERY:
+                self._save_snapshot()
+
+    def _compact(self):
+        """Drop the oldest entries beyond max_entries from the log and index."""
+        with self.lock:
+            keep = self.entries[-self.max_entries:]
+            vectors = self.index.reconstruct_n(self.index.ntotal - len(keep), len(keep))
+
+        # Log first; _write_log drops the old snapshot so a crash before the
+        # new one is written rebuilds the index from the log on load
+        self._write_log([(entry, vector.tolist()) for entry, vector in zip(keep, vectors)])
+        index = faiss.IndexFlatIP(self.index.d)
+        index.add(vectors)
+
+        with self.lock:
+            self.index = index
+            self.entries = keep
+        self._save_snapshot()
+
+    def save(self):
+        """Write the index snapshot if there are unsaved additions."""
+        with self.write_lock:
+            if self.unsaved:
+                self._save_snapshot()
+
+    def _save_snapshot(self):
+        # Copy the index under the lock, write it without blocking lookups
+        with self.lock:
+            data = faiss.serialize_index(self.index)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data.tobytes())
+        os.replace(tmp_path, self.index_path)
+        self.unsaved = 0
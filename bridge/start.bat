@@ -2,8 +2,8 @@
 REM Blue Prism OpenAI Bridge Startup Script
 REM
 REM Usage:
-REM   start.bat          - Start in development mode (Flask dev server)
-REM   start.bat prod     - Start in production mode (Waitress)
+REM   start.bat          - Start in development mode (Quart dev server)
+REM   start.bat prod     - Start in production mode (Hypercorn)
 REM
 REM First time setup:
 REM   1. python -m venv venv
@@ -49,7 +49,7 @@ if "%1"=="prod" (
     echo Starting Blue Prism OpenAI Bridge in PRODUCTION mode...
     echo Server will run on http://127.0.0.1:5050
     echo Press Ctrl+C to stop.
-    python -m waitress --host=127.0.0.1 --port=5050 app:app
+    python -m hypercorn --config hypercorn.toml app:app
 ) else (
     echo Starting Blue Prism OpenAI Bridge in DEVELOPMENT mode...
     echo Server will run on http://127.0.0.1:5050
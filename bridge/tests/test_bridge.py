@@ -7,8 +7,9 @@ Run with: pytest tests/test_bridge.py -v
 import os
 import sys
 import json
+import asyncio
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -16,71 +17,144 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Set a dummy API key for testing
 os.environ["OPENAI_API_KEY"] = "sk-test-key-for-testing"
 
+import app as bridge
 from app import app
 
 
 @pytest.fixture
 def client():
-    """Create a test client for the Flask app."""
+    """Create a test client for the Quart app."""
     app.config["TESTING"] = True
-    with app.test_client() as client:
-        yield client
+    bridge._response_cache.clear()
+    return app.test_client()
+
+
+async def background_tasks_done():
+    """Wait for work the app scheduled after responding, like semantic cache writes."""
+    await asyncio.gather(*app.background_tasks)
 
 
 class TestHealthEndpoint:
     """Tests for the /health endpoint."""
 
-    def test_health_returns_200(self, client):
+    async def test_health_returns_200(self, client):
         """Health endpoint should return 200 OK."""
-        response = client.get("/health")
+        response = await client.get("/health")
         assert response.status_code == 200
 
-    def test_health_returns_json(self, client):
+    async def test_health_returns_json(self, client):
         """Health endpoint should return JSON."""
-        response = client.get("/health")
-        data = response.get_json()
+        response = await client.get("/health")
+        data = await response.get_json()
         assert data is not None
         assert "status" in data
         assert data["status"] == "healthy"
 
-    def test_health_includes_version(self, client):
+    async def test_health_includes_version(self, client):
         """Health endpoint should include version."""
-        response = client.get("/health")
-        data = response.get_json()
+        response = await client.get("/health")
+        data = await response.get_json()
         assert "version" in data
         assert data["version"] == "1.0.0"
 
-    def test_health_includes_openai_configured(self, client):
+    async def test_health_includes_openai_configured(self, client):
         """Health endpoint should indicate if OpenAI is configured."""
-        response = client.get("/health")
-        data = response.get_json()
+        response = await client.get("/health")
+        data = await response.get_json()
         assert "openai_configured" in data
         assert isinstance(data["openai_configured"], bool)
 
+    async def test_health_includes_timestamp(self, client):
+        """Health endpoint should include a UTC timestamp."""
+        response = await client.get("/health")
+        data = await response.get_json()
+        assert response.mimetype == "application/json"
+        assert data["timestamp"].endswith("Z")
+
 
 class TestAnalyzeEndpoint:
     """Tests for the /analyze endpoint."""
 
-    def test_analyze_requires_json(self, client):
+    async def test_analyze_requires_json(self, client):
         """Analyze endpoint should reject non-JSON requests."""
-        response = client.post("/analyze", data="not json")
+        response = await client.post("/analyze", data="not json")
         assert response.status_code == 400
-        data = response.get_json()
+        data = await response.get_json()
         assert data["error_code"] == "VALIDATION_ERROR"
 
-    def test_analyze_requires_query_or_sources(self, client):
+    async def test_analyze_requires_query_or_sources(self, client):
         """Analyze endpoint should require query or sources."""
-        response = client.post(
+        response = await client.post(
             "/analyze",
-            json={"request_id": "test-001"},
-            content_type="application/json"
+            json={"request_id": "test-001"}
         )
         assert response.status_code == 400
-        data = response.get_json()
+        data = await response.get_json()
         assert data["error_code"] == "VALIDATION_ERROR"
 
-    @patch("app.client.responses.create")
-    def test_analyze_success(self, mock_create, client):
+    async def test_analyze_rejects_empty_query_and_sources(self, client):
+        """Empty strings should not satisfy the query/sources requirement."""
+        response = await client.post("/analyze", json={"query": "", "sources": ""})
+        assert response.status_code == 400
+        data = await response.get_json()
+        assert data["error_message"] == "At least one of 'query' or 'sources' is required"
+
+    async def test_analyze_rejects_bad_field_type(self, client):
+        """Wrongly typed fields should be rejected with the field name."""
+        response = await client.post(
+            "/analyze",
+            json={"request_id": "test-type", "query": "Test", "max_tokens": "lots"}
+        )
+        assert response.status_code == 400
+        data = await response.get_json()
+        assert data["error_code"] == "VALIDATION_ERROR"
+        assert data["request_id"] == "test-type"
+        assert "max_tokens" in data["error_message"]
+
+    @pytest.mark.parametrize("body", [["not", "an", "object"], None])
+    async def test_analyze_rejects_non_object_body(self, body, client):
+        """A JSON body that isn't an object should be a validation error."""
+        response = await client.post("/analyze", data=json.dumps(body), headers={"Content-Type": "application/json"})
+        assert response.status_code == 400
+        data = await response.get_json()
+        assert data["error_code"] == "VALIDATION_ERROR"
+        assert data["error_message"] == "Request body must be a JSON object"
+
+    async def test_non_string_request_id_not_echoed(self, client):
+        """A wrongly typed request_id should be reported as unknown."""
+        response = await client.post("/analyze", json={"request_id": 5, "query": "Test"})
+        assert response.status_code == 400
+        data = await response.get_json()
+        assert data["request_id"] == "unknown"
+        assert "request_id" in data["error_message"]
+
+    @pytest.mark.parametrize("body", [b'{"query": "Unclosed', b'\xff\xfe not utf-8'])
+    async def test_analyze_rejects_malformed_json(self, body, client):
+        """A body that doesn't parse as JSON should be a validation error, not a 500."""
+        response = await client.post("/analyze", data=body, headers={"Content-Type": "application/json"})
+        assert response.status_code == 400
+        data = await response.get_json()
+        assert data["error_code"] == "VALIDATION_ERROR"
+        assert data["error_message"] == "Request body is not valid JSON"
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_analyze_whole_float_max_tokens(self, mock_create, client):
+        """max_tokens sent as 5.0 should reach OpenAI as 5 and share 5's cache entry."""
+        mock_response = MagicMock()
+        mock_response.output_text = "Analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 10
+        mock_create.return_value = mock_response
+
+        await client.post("/analyze", json={"query": "Topic", "max_tokens": 5.0})
+        second = await client.post("/analyze", json={"query": "Topic", "max_tokens": 5})
+
+        assert type(mock_create.call_args.kwargs["max_output_tokens"]) is int
+        assert mock_create.call_count == 1
+        assert (await second.get_json())["cache_hit"] is True
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_analyze_success(self, mock_create, client):
         """Analyze endpoint should return analysis on success."""
         # Mock the OpenAI response
         mock_response = MagicMock()
@@ -89,26 +163,25 @@ class TestAnalyzeEndpoint:
         mock_response.usage.total_tokens = 100
         mock_create.return_value = mock_response
 
-        response = client.post(
+        response = await client.post(
             "/analyze",
             json={
                 "request_id": "test-001",
                 "query": "What is AI?",
                 "sources": "AI is artificial intelligence."
-            },
-            content_type="application/json"
+            }
         )
 
         assert response.status_code == 200
-        data = response.get_json()
+        data = await response.get_json()
         assert data["success"] is True
         assert data["request_id"] == "test-001"
         assert data["analysis"] == "This is the AI analysis."
         assert "tokens_used" in data
         assert "processing_time_ms" in data
 
-    @patch("app.client.responses.create")
-    def test_analyze_with_query_only(self, mock_create, client):
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_analyze_with_query_only(self, mock_create, client):
         """Analyze should work with just a query."""
         mock_response = MagicMock()
         mock_response.output_text = "Analysis result."
@@ -116,21 +189,20 @@ class TestAnalyzeEndpoint:
         mock_response.usage.total_tokens = 50
         mock_create.return_value = mock_response
 
-        response = client.post(
+        response = await client.post(
             "/analyze",
             json={
                 "request_id": "test-002",
                 "query": "Explain machine learning"
-            },
-            content_type="application/json"
+            }
         )
 
         assert response.status_code == 200
-        data = response.get_json()
+        data = await response.get_json()
         assert data["success"] is True
 
-    @patch("app.client.responses.create")
-    def test_analyze_with_sources_only(self, mock_create, client):
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_analyze_with_sources_only(self, mock_create, client):
         """Analyze should work with just sources."""
         mock_response = MagicMock()
         mock_response.output_text = "Analysis of sources."
@@ -138,21 +210,69 @@ class TestAnalyzeEndpoint:
         mock_response.usage.total_tokens = 75
         mock_create.return_value = mock_response
 
-        response = client.post(
+        response = await client.post(
             "/analyze",
             json={
                 "request_id": "test-003",
                 "sources": "Some research content to analyze."
-            },
-            content_type="application/json"
+            }
+        )
+
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert data["success"] is True
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_analyze_prompt_format(self, mock_create, client):
+        """Analyze should send query, sources and the closing instruction."""
+        mock_response = MagicMock()
+        mock_response.output_text = "Analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 10
+        mock_create.return_value = mock_response
+
+        await client.post("/analyze", json={"query": "Topic", "sources": "Body text"})
+
+        assert mock_create.call_args.kwargs["input"] == (
+            "Research Query: Topic\n\n"
+            "Source Content:\nBody text\n\n"
+            "Please analyze the above content and provide a comprehensive research summary."
+        )
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_analyze_lone_surrogate(self, mock_create, client):
+        """A lone surrogate escape in scraped sources should be replaced, not rejected."""
+        mock_response = MagicMock()
+        mock_response.output_text = "Analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 10
+        mock_create.return_value = mock_response
+
+        response = await client.post(
+            "/analyze",
+            data=b'{"query": "Topic", "sources": "Cut off \\ud83d emoji"}',
+            headers={"Content-Type": "application/json"}
         )
 
         assert response.status_code == 200
-        data = response.get_json()
+        assert "Cut off \ufffd emoji" in mock_create.call_args.kwargs["input"]
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_analyze_missing_usage(self, mock_create, client):
+        """Missing usage data should report zero tokens."""
+        mock_response = MagicMock()
+        mock_response.output_text = "Analysis."
+        mock_response.usage = None
+        mock_create.return_value = mock_response
+
+        response = await client.post("/analyze", json={"query": "No usage"})
+
+        data = await response.get_json()
         assert data["success"] is True
+        assert data["tokens_used"] == 0
 
-    @patch("app.client.responses.create")
-    def test_analyze_auto_request_id(self, mock_create, client):
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_analyze_auto_request_id(self, mock_create, client):
         """Analyze should auto-generate request_id if not provided."""
         mock_response = MagicMock()
         mock_response.output_text = "Analysis."
@@ -160,22 +280,21 @@ class TestAnalyzeEndpoint:
         mock_response.usage.total_tokens = 10
         mock_create.return_value = mock_response
 
-        response = client.post(
+        response = await client.post(
             "/analyze",
-            json={"query": "Test query"},
-            content_type="application/json"
+            json={"query": "Test query"}
         )
 
         assert response.status_code == 200
-        data = response.get_json()
+        data = await response.get_json()
         assert data["request_id"].startswith("auto-")
 
 
 class TestErrorHandling:
     """Tests for error handling."""
 
-    @patch("app.client.responses.create")
-    def test_rate_limit_error(self, mock_create, client):
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_rate_limit_error(self, mock_create, client):
         """Should return recoverable error on rate limit."""
         from openai import RateLimitError
 
@@ -185,20 +304,19 @@ class TestErrorHandling:
             body={}
         )
 
-        response = client.post(
+        response = await client.post(
             "/analyze",
-            json={"request_id": "test-rate", "query": "Test"},
-            content_type="application/json"
+            json={"request_id": "test-rate", "query": "Test"}
         )
 
         assert response.status_code == 429
-        data = response.get_json()
+        data = await response.get_json()
         assert data["success"] is False
         assert data["error_code"] == "RATE_LIMIT"
         assert data["recoverable"] is True
 
-    @patch("app.client.responses.create")
-    def test_auth_error(self, mock_create, client):
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_auth_error(self, mock_create, client):
         """Should return non-recoverable error on auth failure."""
         from openai import AuthenticationError
 
@@ -208,54 +326,926 @@ class TestErrorHandling:
             body={}
         )
 
-        response = client.post(
+        response = await client.post(
             "/analyze",
-            json={"request_id": "test-auth", "query": "Test"},
-            content_type="application/json"
+            json={"request_id": "test-auth", "query": "Test"}
         )
 
         assert response.status_code == 401
-        data = response.get_json()
+        data = await response.get_json()
         assert data["success"] is False
         assert data["error_code"] == "AUTH_ERROR"
         assert data["recoverable"] is False
 
-    @patch("app.client.responses.create")
-    def test_timeout_error(self, mock_create, client):
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_timeout_error(self, mock_create, client):
         """Should return recoverable error on timeout."""
         from openai import APITimeoutError
 
         mock_create.side_effect = APITimeoutError(request=MagicMock())
 
-        response = client.post(
+        response = await client.post(
             "/analyze",
-            json={"request_id": "test-timeout", "query": "Test"},
-            content_type="application/json"
+            json={"request_id": "test-timeout", "query": "Test"}
         )
 
         assert response.status_code == 504
-        data = response.get_json()
+        data = await response.get_json()
         assert data["success"] is False
         assert data["error_code"] == "TIMEOUT"
         assert data["recoverable"] is True
 
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_context_length_error(self, mock_create, client):
+        """Should return non-recoverable error when content is too large."""
+        from openai import BadRequestError
+
+        mock_create.side_effect = BadRequestError(
+            message="This model's Maximum Context Length is 400000 tokens",
+            response=MagicMock(status_code=400),
+            body={}
+        )
+
+        response = await client.post(
+            "/analyze",
+            json={"request_id": "test-context", "query": "Test"}
+        )
+
+        assert response.status_code == 400
+        data = await response.get_json()
+        assert data["error_code"] == "CONTEXT_LENGTH"
+        assert data["recoverable"] is False
+
+    @patch("app.client.chat.completions.create", new_callable=AsyncMock)
+    async def test_chat_context_length_error(self, mock_create, client):
+        """Chat should detect context length errors too."""
+        from openai import BadRequestError
+
+        mock_create.side_effect = BadRequestError(
+            message="context_length_exceeded",
+            response=MagicMock(status_code=400),
+            body={}
+        )
+
+        response = await client.post(
+            "/chat",
+            json={"messages": [{"role": "user", "content": "Very long"}]}
+        )
+
+        assert response.status_code == 400
+        data = await response.get_json()
+        assert data["error_code"] == "CONTEXT_LENGTH"
+
+
+class TestPayloadTooLarge:
+    """Tests for the 413 handler."""
+
+    async def test_oversized_body_returns_413(self, client):
+        """Bodies over MAX_CONTENT_LENGTH should get the standard error shape."""
+        with patch.dict(app.config, {"MAX_CONTENT_LENGTH": 16}):
+            response = await client.post("/analyze", json={"query": "x" * 100})
+
+        assert response.status_code == 413
+        assert response.mimetype == "application/json"
+        data = await response.get_json()
+        assert data["success"] is False
+        assert data["error_code"] == "PAYLOAD_TOO_LARGE"
+        assert data["recoverable"] is False
+        assert data["timestamp"].endswith("Z")
+        assert data["error_message"].endswith("(50MB)")
+
+    @pytest.mark.parametrize("num_bytes, expected", [
+        (52428800, "50MB"),
+        (512 * 1024, "512KB"),
+        (1536 * 1024, "1536KB"),
+        (1000, "1000 bytes"),
+        (0, "0 bytes")
+    ])
+    def test_format_size(self, num_bytes, expected):
+        """The limit in the 413 message should be exact, never rounded down."""
+        assert bridge.format_size(num_bytes) == expected
+
+
+class TestResponseCache:
+    """Tests for the /analyze exact-match response cache."""
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_identical_request_served_from_cache(self, mock_create, client):
+        """A repeated prompt should not call OpenAI again."""
+        mock_response = MagicMock()
+        mock_response.output_text = "Cached analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 40
+        mock_create.return_value = mock_response
+
+        payload = {"request_id": "test-cache", "query": "Same question"}
+        first = await (await client.post("/analyze", json=payload)).get_json()
+        second = await (await client.post("/analyze", json=payload)).get_json()
+
+        assert mock_create.call_count == 1
+        assert first["cache_hit"] is False
+        assert second["cache_hit"] is True
+        assert second["cache_type"] == "exact"
+        assert second["analysis"] == first["analysis"]
+        assert second["tokens_used"] == first["tokens_used"]
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_different_model_is_a_cache_miss(self, mock_create, client):
+        """The cache key should include the model."""
+        mock_response = MagicMock()
+        mock_response.output_text = "Analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 10
+        mock_create.return_value = mock_response
+
+        await client.post("/analyze", json={"query": "Same question", "model": "gpt-5-nano"})
+        response = await client.post("/analyze", json={"query": "Same question", "model": "gpt-5-mini"})
+        data = await response.get_json()
+
+        assert mock_create.call_count == 2
+        assert data["cache_hit"] is False
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_errors_are_not_cached(self, mock_create, client):
+        """A failed call should be retried on the next request."""
+        from openai import APITimeoutError
+
+        mock_response = MagicMock()
+        mock_response.output_text = "Recovered."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 10
+        mock_create.side_effect = [APITimeoutError(request=MagicMock()), mock_response]
+
+        payload = {"query": "Flaky question"}
+        first = await client.post("/analyze", json=payload)
+        second = await client.post("/analyze", json=payload)
+
+        assert first.status_code == 504
+        assert second.status_code == 200
+        assert (await second.get_json())["cache_hit"] is False
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_semantic_hit_skips_openai(self, mock_create, client):
+        """A semantic cache match should be returned without calling OpenAI."""
+        fake_cache = MagicMock()
+        fake_cache.lookup.return_value = ("Paraphrase analysis.", 30)
+
+        with patch("app.semantic_cache", fake_cache):
+            response = await client.post("/analyze", json={"query": "Reworded question"})
+
+        data = await response.get_json()
+        assert mock_create.call_count == 0
+        assert data["analysis"] == "Paraphrase analysis."
+        assert data["cache_hit"] is True
+        assert data["cache_type"] == "semantic"
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_semantic_miss_stores_result(self, mock_create, client):
+        """A semantic cache miss should call OpenAI and index the answer."""
+        mock_response = MagicMock()
+        mock_response.output_text = "Fresh analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 20
+        mock_create.return_value = mock_response
+
+        fake_cache = MagicMock()
+        fake_cache.lookup.return_value = None
+
+        with patch("app.semantic_cache", fake_cache):
+            response = await client.post("/analyze", json={"query": "New question"})
+            await background_tasks_done()
+
+        data = await response.get_json()
+        assert mock_create.call_count == 1
+        assert data["cache_type"] is None
+        fake_cache.add.assert_called_once()
+        assert fake_cache.add.call_args.args[4:] == ("Fresh analysis.", 20)
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_semantic_store_failure_still_returns_answer(self, mock_create, client):
+        """A failed semantic cache write should not fail the request."""
+        mock_response = MagicMock()
+        mock_response.output_text = "Fresh analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 20
+        mock_create.return_value = mock_response
+
+        fake_cache = MagicMock()
+        fake_cache.lookup.return_value = None
+        fake_cache.add.side_effect = OSError("disk full")
+
+        with patch("app.semantic_cache", fake_cache):
+            response = await client.post("/analyze", json={"query": "Unstorable question"})
+            await background_tasks_done()
+
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert data["analysis"] == "Fresh analysis."
+        assert data["tokens_used"] == 20
+        fake_cache.add.assert_called_once()
+
+    @pytest.mark.parametrize("failing", ["embed", "lookup"])
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_semantic_lookup_failure_falls_back_to_openai(self, mock_create, failing, client):
+        """A failing semantic embed or lookup should not fail the request."""
+        mock_response = MagicMock()
+        mock_response.output_text = "Fresh analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 20
+        mock_create.return_value = mock_response
+
+        fake_cache = MagicMock()
+        getattr(fake_cache, failing).side_effect = RuntimeError("index corrupt")
+
+        with patch("app.semantic_cache", fake_cache):
+            response = await client.post("/analyze", json={"query": "Unsearchable question"})
+            await background_tasks_done()
+
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert data["analysis"] == "Fresh analysis."
+        assert mock_create.call_count == 1
+        fake_cache.add.assert_not_called()
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_semantic_cache_embeds_query_and_matches_sources(self, mock_create, client):
+        """Only the query is embedded; the sources must match by digest."""
+        mock_response = MagicMock()
+        mock_response.output_text = "Analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 20
+        mock_create.return_value = mock_response
+
+        fake_cache = MagicMock()
+        fake_cache.lookup.return_value = None
+
+        with patch("app.semantic_cache", fake_cache):
+            await client.post("/analyze", json={"query": "Topic", "sources": "Long body"})
+            await client.post("/analyze", json={"query": "Topic", "sources": "Other body"})
+            await background_tasks_done()
+
+        assert fake_cache.embed.call_args_list[0].args == ("Topic",)
+        first_digest = fake_cache.lookup.call_args_list[0].args[3]
+        second_digest = fake_cache.lookup.call_args_list[1].args[3]
+        assert first_digest != second_digest
+        assert fake_cache.add.call_args_list[0].args[3] == first_digest
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_semantic_cache_skipped_without_query(self, mock_create, client):
+        """Sources-only requests have nothing to paraphrase and skip the semantic cache."""
+        mock_response = MagicMock()
+        mock_response.output_text = "Analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 20
+        mock_create.return_value = mock_response
+
+        fake_cache = MagicMock()
+        with patch("app.semantic_cache", fake_cache):
+            response = await client.post("/analyze", json={"sources": "Only sources"})
+
+        assert response.status_code == 200
+        fake_cache.embed.assert_not_called()
+        fake_cache.add.assert_not_called()
+
+
+class TestInflightSharing:
+    """Tests for sharing in-flight OpenAI calls between identical /analyze requests."""
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_concurrent_duplicates_share_one_call(self, mock_create, client):
+        """Identical concurrent prompts should call OpenAI once."""
+        import asyncio
+
+        mock_response = MagicMock()
+        mock_response.output_text = "Shared analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 15
+        mock_create.return_value = mock_response
+
+        payload = {"query": "Fan-out question"}
+        responses = await asyncio.gather(*(client.post("/analyze", json=payload) for _ in range(3)))
+
+        assert mock_create.call_count == 1
+        for response in responses:
+            data = await response.get_json()
+            assert data["success"] is True
+            assert data["analysis"] == "Shared analysis."
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_errors_reach_each_request(self, mock_create, client):
+        """An OpenAI error should be returned to every request sharing the call."""
+        import asyncio
+        from openai import APITimeoutError
+
+        mock_create.side_effect = APITimeoutError(request=MagicMock())
+
+        payload = {"query": "Slow question"}
+        responses = await asyncio.gather(*(client.post("/analyze", json=payload) for _ in range(2)))
+
+        assert mock_create.call_count == 1
+        assert [response.status_code for response in responses] == [504, 504]
+        assert bridge._inflight_calls == {}
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_shared_call_stored_once(self, mock_create, client):
+        """Requests joining a call should not write their own cache entries."""
+        import asyncio
+
+        mock_response = MagicMock()
+        mock_response.output_text = "Shared analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 15
+
+        # Hold the call open until every request has joined it
+        release = asyncio.Event()
+
+        async def slow_create(**kwargs):
+            await release.wait()
+            return mock_response
+
+        mock_create.side_effect = slow_create
+
+        fake_cache = MagicMock()
+        fake_cache.lookup.return_value = None
+
+        payload = {"query": "Fan-out question"}
+        with patch("app.semantic_cache", fake_cache), patch("app.cache_put") as mock_put:
+            requests = asyncio.gather(*(client.post("/analyze", json=payload) for _ in range(3)))
+            await asyncio.sleep(0.05)
+            release.set()
+            await requests
+            await background_tasks_done()
+
+        assert mock_create.call_count == 1
+        assert mock_put.call_count == 1
+        fake_cache.add.assert_called_once()
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_late_duplicate_joins_inflight_call(self, mock_create, client):
+        """A duplicate arriving while the first call is still running should join it."""
+        import asyncio
+
+        release = asyncio.Event()
+        mock_response = MagicMock()
+        mock_response.output_text = "Slow analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 15
+
+        async def slow_create(**kwargs):
+            await release.wait()
+            return mock_response
+
+        mock_create.side_effect = slow_create
+
+        payload = {"query": "Long-running question"}
+        first = asyncio.ensure_future(client.post("/analyze", json=payload))
+        await asyncio.sleep(0.05)
+        second = asyncio.ensure_future(client.post("/analyze", json=payload))
+        await asyncio.sleep(0.05)
+        release.set()
+
+        responses = await asyncio.gather(first, second)
+        assert mock_create.call_count == 1
+        for response in responses:
+            data = await response.get_json()
+            assert data["analysis"] == "Slow analysis."
+
+
+class TestBatchEndpoints:
+    """Tests for the /analyze_batch and /batch_result endpoints."""
+
+    async def test_analyze_batch_requires_items(self, client):
+        """Batch endpoint should require a non-empty items array."""
+        response = await client.post("/analyze_batch", json={"request_id": "test-batch"})
+        assert response.status_code == 400
+        data = await response.get_json()
+        assert data["error_code"] == "VALIDATION_ERROR"
+
+    @pytest.mark.parametrize("body", [
+        [{"query": "A"}],
+        {"items": ["not an object"]},
+        {"items": [{"query": 42}]},
+        {"items": [{"query": "A"}], "max_tokens": "many"},
+        {"items": [{"query": "A"}], "model": 5},
+        {"items": [{"query": "A"}], "max_tokens": 0}
+    ])
+    async def test_analyze_batch_rejects_invalid_body(self, body, client):
+        """Malformed batch bodies should be rejected before anything is uploaded."""
+        response = await client.post("/analyze_batch", json=body)
+        assert response.status_code == 400
+        data = await response.get_json()
+        assert data["error_code"] == "VALIDATION_ERROR"
+
+    async def test_analyze_batch_rejects_empty_item(self, client):
+        """Each item needs a query or sources."""
+        response = await client.post("/analyze_batch", json={"items": [{"request_id": "bp-1"}]})
+        assert response.status_code == 400
+        data = await response.get_json()
+        assert "bp-1" in data["error_message"]
+
+    async def test_analyze_batch_rejects_duplicate_ids(self, client):
+        """Item request_ids become custom_ids and must be unique."""
+        response = await client.post(
+            "/analyze_batch",
+            json={"items": [
+                {"request_id": "bp-1", "query": "A"},
+                {"request_id": "bp-1", "query": "B"}
+            ]}
+        )
+        assert response.status_code == 400
+
+    @patch("app.client.batches.create", new_callable=AsyncMock)
+    @patch("app.client.files.create", new_callable=AsyncMock)
+    async def test_analyze_batch_submits_jsonl(self, mock_files, mock_batches, client):
+        """Batch endpoint should upload one Responses request per item."""
+        mock_files.return_value = MagicMock(id="file-123")
+        mock_batches.return_value = MagicMock(id="batch-123", status="validating")
+
+        response = await client.post(
+            "/analyze_batch",
+            json={
+                "request_id": "test-batch",
+                "items": [
+                    {"request_id": "bp-1", "query": "First topic"},
+                    {"request_id": "bp-2", "sources": "Second source"}
+                ]
+            }
+        )
+
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert data["batch_id"] == "batch-123"
+        assert data["item_count"] == 2
+
+        _, content = mock_files.call_args.kwargs["file"]
+        lines = [json.loads(line) for line in content.decode("utf-8").splitlines()]
+        assert [line["custom_id"] for line in lines] == ["bp-1", "bp-2"]
+        assert all(line["url"] == "/v1/responses" for line in lines)
+        assert mock_batches.call_args.kwargs["input_file_id"] == "file-123"
+
+    @patch("app.client.batches.retrieve", new_callable=AsyncMock)
+    async def test_batch_result_in_progress(self, mock_retrieve, client):
+        """Polling an unfinished batch should not return results yet."""
+        mock_retrieve.return_value = MagicMock(status="in_progress")
+
+        response = await client.get("/batch_result/batch-123")
+        data = await response.get_json()
+        assert data["finished"] is False
+        assert "results" not in data
+
+    @patch("app.client.batches.retrieve", new_callable=AsyncMock)
+    async def test_batch_result_unknown_batch(self, mock_retrieve, client):
+        """An unknown batch_id should return BATCH_NOT_FOUND."""
+        from openai import NotFoundError
+
+        mock_retrieve.side_effect = NotFoundError(
+            message="No such batch",
+            response=MagicMock(status_code=404),
+            body={}
+        )
+
+        response = await client.get("/batch_result/batch-missing")
+
+        assert response.status_code == 404
+        data = await response.get_json()
+        assert data["error_code"] == "BATCH_NOT_FOUND"
+        assert data["request_id"] == "batch-missing"
+
+    @patch("app.client.files.content", new_callable=AsyncMock)
+    @patch("app.client.batches.retrieve", new_callable=AsyncMock)
+    async def test_batch_result_completed(self, mock_retrieve, mock_content, client):
+        """A completed batch should return per-item analyses."""
+        mock_retrieve.return_value = MagicMock(
+            status="completed", output_file_id="file-out", error_file_id=None, errors=None
+        )
+        output = {
+            "custom_id": "bp-1",
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "output": [{"type": "message", "content": [{"type": "output_text", "text": "Batch analysis."}]}],
+                    "usage": {"total_tokens": 60}
+                }
+            }
+        }
+        mock_content.return_value = MagicMock(text=json.dumps(output) + "\n")
+
+        response = await client.get("/batch_result/batch-123")
+        data = await response.get_json()
+        assert data["finished"] is True
+        assert data["results"] == [
+            {"request_id": "bp-1", "success": True, "analysis": "Batch analysis.", "tokens_used": 60}
+        ]
+        assert data["errors"] == []
+
+    @patch("app.client.batches.retrieve", new_callable=AsyncMock)
+    async def test_batch_result_failed_reports_errors(self, mock_retrieve, client):
+        """A batch rejected during validation should report its batch-level errors."""
+        error = MagicMock(code="invalid_request", message="Bad input line", line=2)
+        mock_retrieve.return_value = MagicMock(
+            status="failed", output_file_id=None, error_file_id=None, errors=MagicMock(data=[error])
+        )
+
+        response = await client.get("/batch_result/batch-123")
+        data = await response.get_json()
+        assert data["finished"] is True
+        assert data["success"] is False
+        assert data["results"] == []
+        assert data["errors"] == [{"code": "invalid_request", "message": "Bad input line", "line": 2}]
+
+
+class stream_of:
+    """Async iterator over items that records being closed, like an OpenAI stream."""
+
+    def __init__(self, items):
+        self.items = items
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+    async def __aiter__(self):
+        for item in self.items:
+            yield item
+
+
+def parse_events(body):
+    """Decode the JSON payloads of a text/event-stream body."""
+    return [
+        json.loads(frame[len("data: "):])
+        for frame in body.decode("utf-8").split("\n\n")
+        if frame.startswith("data: ")
+    ]
+
+
+class TestStreaming:
+    """Tests for stream=true on /analyze and /chat."""
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_analyze_stream(self, mock_create, client):
+        """Analyze should forward output_text deltas then a done frame."""
+        completed = MagicMock(type="response.completed")
+        completed.response.usage.total_tokens = 42
+        mock_create.return_value = stream_of([
+            MagicMock(type="response.output_text.delta", delta="Hello "),
+            MagicMock(type="response.output_text.delta", delta="world"),
+            completed
+        ])
+
+        response = await client.post(
+            "/analyze",
+            json={"request_id": "test-stream", "query": "Stream me", "stream": True}
+        )
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+        events = parse_events(await response.get_data())
+        assert [e["delta"] for e in events if "delta" in e] == ["Hello ", "world"]
+        assert events[-1]["done"] is True
+        assert events[-1]["tokens_used"] == 42
+        assert mock_create.call_args.kwargs["stream"] is True
+        assert mock_create.return_value.closed is True
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_stream_has_no_response_timeout(self, mock_create, client):
+        """Quart's RESPONSE_TIMEOUT must not cut off a long-running stream."""
+        mock_create.return_value = stream_of([])
+
+        async with app.test_request_context("/analyze", method="POST"):
+            response = await bridge.stream_analysis("test", "gpt-5-nano", "Stream me", 100, 0)
+
+        assert response.timeout is None
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_stream_closed_on_disconnect(self, mock_create, client):
+        """Abandoning the response body should close the upstream stream."""
+        stream = stream_of([
+            MagicMock(type="response.output_text.delta", delta="Hello "),
+            MagicMock(type="response.output_text.delta", delta="world")
+        ])
+        mock_create.return_value = stream
+
+        async with app.test_request_context("/analyze", method="POST"):
+            response = await bridge.stream_analysis("test", "gpt-5-nano", "Stream me", 100, 0)
+
+        async with response.response as body:
+            async for frame in body:
+                break
+
+        assert stream.closed is True
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_stream_error_mid_stream(self, mock_create, client):
+        """A failure event should end the stream with an error frame and close it."""
+        stream = stream_of([
+            MagicMock(type="response.output_text.delta", delta="Partial"),
+            MagicMock(type="response.failed")
+        ])
+        mock_create.return_value = stream
+
+        response = await client.post("/analyze", json={"query": "Fail midway", "stream": True})
+
+        events = parse_events(await response.get_data())
+        assert events[-1]["done"] is True
+        assert events[-1]["success"] is False
+        assert stream.closed is True
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_analyze_stream_query_param(self, mock_create, client):
+        """?stream=true should also select streaming."""
+        mock_create.return_value = stream_of([])
+
+        response = await client.post("/analyze?stream=true", json={"query": "Stream me too"})
+
+        assert response.mimetype == "text/event-stream"
+        assert mock_create.call_args.kwargs["stream"] is True
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_analyze_stream_open_error(self, mock_create, client):
+        """Errors opening the stream should use the normal error response."""
+        from openai import APITimeoutError
+
+        mock_create.side_effect = APITimeoutError(request=MagicMock())
+
+        response = await client.post("/analyze", json={"query": "Test", "stream": True})
+
+        assert response.status_code == 504
+        data = await response.get_json()
+        assert data["error_code"] == "TIMEOUT"
+
+    @patch("app.client.chat.completions.create", new_callable=AsyncMock)
+    async def test_chat_stream(self, mock_create, client):
+        """Chat should forward content deltas and report usage at the end."""
+        first = MagicMock(usage=None)
+        first.choices = [MagicMock(finish_reason=None)]
+        first.choices[0].delta.content = "Hi!"
+        last = MagicMock(usage=None)
+        last.choices = [MagicMock(finish_reason="stop")]
+        last.choices[0].delta.content = None
+        usage = MagicMock(choices=[])
+        usage.usage.total_tokens = 12
+        mock_create.return_value = stream_of([first, last, usage])
+
+        response = await client.post(
+            "/chat",
+            json={"messages": [{"role": "user", "content": "Hello!"}], "stream": True}
+        )
+
+        events = parse_events(await response.get_data())
+        assert events[0] == {"delta": "Hi!"}
+        assert events[-1]["finish_reason"] == "stop"
+        assert events[-1]["tokens_used"] == 12
+        assert mock_create.return_value.closed is True
+
+
+class TestCompressedRequests:
+    """Tests for Content-Encoding gzip/zstd request bodies."""
+
+    @pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_compressed_body_is_decoded(self, mock_create, encoding, client):
+        """Compressed JSON bodies should be accepted transparently."""
+        import gzip
+        import zstandard
+
+        mock_response = MagicMock()
+        mock_response.output_text = "Decoded analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 10
+        mock_create.return_value = mock_response
+
+        raw = json.dumps({"request_id": f"test-{encoding}", "query": f"Compressed {encoding}"}).encode()
+        body = gzip.compress(raw) if encoding == "gzip" else zstandard.ZstdCompressor().compress(raw)
+
+        response = await client.post(
+            "/analyze",
+            data=body,
+            headers={"Content-Type": "application/json", "Content-Encoding": encoding}
+        )
+
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert data["request_id"] == f"test-{encoding}"
+        assert f"Compressed {encoding}" in mock_create.call_args.kwargs["input"]
+
+    @pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_multi_frame_body_is_decoded(self, mock_create, encoding, client):
+        """Bodies made of several gzip members or zstd frames should be joined."""
+        import gzip
+        import zstandard
+
+        mock_response = MagicMock()
+        mock_response.output_text = "Decoded analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 10
+        mock_create.return_value = mock_response
+
+        raw = json.dumps({"request_id": f"test-{encoding}", "query": "Split " * 500}).encode()
+        compress = gzip.compress if encoding == "gzip" else zstandard.ZstdCompressor().compress
+        body = compress(raw[:8]) + compress(raw[8:])
+
+        response = await client.post(
+            "/analyze",
+            data=body,
+            headers={"Content-Type": "application/json", "Content-Encoding": encoding}
+        )
+
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert data["request_id"] == f"test-{encoding}"
+
+    @pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+    async def test_empty_compressed_body(self, encoding, client):
+        """An empty body with a Content-Encoding header is just an empty body."""
+        response = await client.get("/health", headers={"Content-Encoding": encoding})
+        assert response.status_code == 200
+
+    async def test_compressed_malformed_json(self, client):
+        """A body that decompresses to something other than JSON should be a validation error."""
+        import gzip
+
+        response = await client.post(
+            "/analyze",
+            data=gzip.compress(b"not json"),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"}
+        )
+        assert response.status_code == 400
+        data = await response.get_json()
+        assert data["error_code"] == "VALIDATION_ERROR"
+
+    async def test_unsupported_encoding(self, client):
+        """Unknown encodings should be rejected with 415."""
+        response = await client.post(
+            "/analyze",
+            data=b"...",
+            headers={"Content-Type": "application/json", "Content-Encoding": "br"}
+        )
+        assert response.status_code == 415
+        data = await response.get_json()
+        assert data["error_code"] == "UNSUPPORTED_ENCODING"
+
+    async def test_corrupt_body(self, client):
+        """Bodies that fail to decompress should be a validation error."""
+        response = await client.post(
+            "/analyze",
+            data=b"not gzip at all",
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"}
+        )
+        assert response.status_code == 400
+        data = await response.get_json()
+        assert data["error_code"] == "VALIDATION_ERROR"
+
+    @pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+    async def test_truncated_body(self, encoding, client):
+        """A body cut off mid-stream should be a validation error, not an empty body."""
+        import gzip
+        import zstandard
+
+        raw = json.dumps({"query": "Truncated " * 200}).encode("utf-8")
+        body = gzip.compress(raw) if encoding == "gzip" else zstandard.ZstdCompressor().compress(raw)
+
+        response = await client.post(
+            "/analyze",
+            data=body[:len(body) // 2],
+            headers={"Content-Type": "application/json", "Content-Encoding": encoding}
+        )
+        assert response.status_code == 400
+        data = await response.get_json()
+        assert data["error_code"] == "VALIDATION_ERROR"
+
+    async def test_decompressed_size_limit(self, client):
+        """The size limit should apply to the decompressed body."""
+        import gzip
+
+        body = gzip.compress(json.dumps({"query": "x" * 2048}).encode())
+        with patch.dict(app.config, {"MAX_CONTENT_LENGTH": 1024}):
+            response = await client.post(
+                "/analyze",
+                data=body,
+                headers={"Content-Type": "application/json", "Content-Encoding": "gzip"}
+            )
+        assert response.status_code == 413
+
+
+class TestRateLimiting:
+    """Tests for the in-process token bucket."""
+
+    async def test_bucket_allows_burst_up_to_capacity(self):
+        """A full bucket should hand out its capacity without waiting."""
+        import time
+        from rate_limit import TokenBucket
+
+        bucket = TokenBucket(rate_per_minute=5)
+        started = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        assert time.monotonic() - started < 0.1
+
+    async def test_bucket_waits_when_empty(self):
+        """An empty bucket should wait roughly one refill interval."""
+        import time
+        from rate_limit import TokenBucket
+
+        bucket = TokenBucket(rate_per_minute=600)  # one token per 0.1s
+        bucket.tokens = 0
+        started = time.monotonic()
+        await bucket.acquire()
+        assert time.monotonic() - started >= 0.09
+
+    @patch("app.client.responses.create", new_callable=AsyncMock)
+    async def test_model_calls_take_a_token(self, mock_create, client):
+        """Configured rate limiting should gate each OpenAI call."""
+        mock_response = MagicMock()
+        mock_response.output_text = "Paced analysis."
+        mock_response.usage = MagicMock()
+        mock_response.usage.total_tokens = 10
+        mock_create.return_value = mock_response
+
+        limiter = MagicMock()
+        limiter.acquire = AsyncMock()
+        with patch("app.rate_limiter", limiter):
+            response = await client.post("/analyze", json={"query": "Paced question"})
+
+        assert response.status_code == 200
+        limiter.acquire.assert_awaited_once()
+
+
+class TestPreload:
+    """Tests for warming the OpenAI connection at startup."""
+
+    @pytest.fixture(autouse=True)
+    def keep_http_client_open(self):
+        """Serving shutdown closes the shared pool; keep it usable for later tests."""
+        with patch("app.http_client.aclose", new_callable=AsyncMock):
+            yield
+
+    @patch("app.client.models.list", new_callable=AsyncMock)
+    async def test_preload_opens_connection(self, mock_list):
+        """With PRELOAD_OPENAI on, startup should make one cheap API call."""
+        with patch("app.PRELOAD_OPENAI", True):
+            async with app.test_app():
+                pass
+        mock_list.assert_awaited_once()
+
+    @patch("app.client.models.list", new_callable=AsyncMock)
+    async def test_preload_disabled_by_default(self, mock_list):
+        """Without PRELOAD_OPENAI, startup should not call OpenAI."""
+        async with app.test_app():
+            pass
+        mock_list.assert_not_awaited()
+
+    @patch("app.client.models.list", new_callable=AsyncMock)
+    async def test_preload_failure_does_not_block_startup(self, mock_list):
+        """A failed warm-up should only be logged."""
+        mock_list.side_effect = RuntimeError("no network")
+        with patch("app.PRELOAD_OPENAI", True):
+            async with app.test_app() as test_app:
+                response = await test_app.test_client().get("/health")
+                assert response.status_code == 200
+
 
 class TestChatEndpoint:
     """Tests for the /chat endpoint."""
 
-    def test_chat_requires_messages(self, client):
+    async def test_chat_requires_messages(self, client):
         """Chat endpoint should require messages array."""
-        response = client.post(
+        response = await client.post(
             "/chat",
-            json={"request_id": "test-chat"},
-            content_type="application/json"
+            json={"request_id": "test-chat"}
         )
         assert response.status_code == 400
-        data = response.get_json()
+        data = await response.get_json()
+        assert data["error_code"] == "VALIDATION_ERROR"
+
+    async def test_chat_requires_messages_summary(self, client):
+        """Missing or empty messages should get the endpoint's summary message."""
+        for body in ({}, {"messages": []}):
+            response = await client.post("/chat", json=body)
+            data = await response.get_json()
+            assert data["error_message"] == "'messages' array is required"
+
+    async def test_chat_message_missing_role(self, client):
+        """A message without a role should be named, not reported as missing messages."""
+        response = await client.post("/chat", json={"messages": [{"content": "hi"}]})
+        assert response.status_code == 400
+        data = await response.get_json()
+        assert data["error_code"] == "VALIDATION_ERROR"
+        assert data["error_message"].startswith("messages[0]")
+        assert "role" in data["error_message"]
+
+    async def test_chat_rejects_non_object_messages(self, client):
+        """Each message must be an object with a role."""
+        response = await client.post("/chat", json={"messages": ["Hello!"]})
+        assert response.status_code == 400
+        data = await response.get_json()
         assert data["error_code"] == "VALIDATION_ERROR"
 
-    @patch("app.client.chat.completions.create")
-    def test_chat_success(self, mock_create, client):
+    @patch("app.client.chat.completions.create", new_callable=AsyncMock)
+    async def test_chat_success(self, mock_create, client):
         """Chat endpoint should return content on success."""
         mock_response = MagicMock()
         mock_response.choices = [MagicMock()]
@@ -265,19 +1255,18 @@ class TestChatEndpoint:
         mock_response.usage.total_tokens = 25
         mock_create.return_value = mock_response
 
-        response = client.post(
+        response = await client.post(
             "/chat",
             json={
                 "request_id": "test-chat-001",
                 "messages": [
                     {"role": "user", "content": "Hello!"}
                 ]
-            },
-            content_type="application/json"
+            }
         )
 
         assert response.status_code == 200
-        data = response.get_json()
+        data = await response.get_json()
         assert data["success"] is True
         assert data["content"] == "Hello from OpenAI!"
         assert data["finish_reason"] == "stop"
@@ -0,0 +1,215 @@
+"""
+Tests for the semantic response cache, using a stub encoder in place of
+sentence-transformers.
+
+Run with: pytest tests/test_semantic_cache.py -v
+"""
+
+import os
+import sys
+import pytest
+
+faiss = pytest.importorskip("faiss")
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import semantic_cache as semantic
+
+
+class StubEncoder:
+    """Maps each known text to a fixed unit vector."""
+
+    VECTORS = {
+        "tariffs": [1.0, 0.0, 0.0, 0.0],
+        "tariff impact": [0.99, 0.141, 0.0, 0.0],
+        "weather": [0.0, 0.0, 1.0, 0.0],
+        "elections": [0.0, 1.0, 0.0, 0.0],
+    }
+
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+    def encode(self, texts, normalize_embeddings=True):
+        vectors = np.array([self.VECTORS[t] for t in texts], dtype="float32")
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class WideStubEncoder(StubEncoder):
+    """Stub for a different embedding model with a larger dimension."""
+
+    VECTORS = {text: vector + [0.0] * 4 for text, vector in StubEncoder.VECTORS.items()}
+
+    def get_sentence_embedding_dimension(self):
+        return 8
+
+
+def make_cache(path, **kwargs):
+    kwargs.setdefault("encoder", StubEncoder())
+    return semantic.SemanticCache(str(path), threshold=0.9, **kwargs)
+
+
+def add(cache, text, sources_digest="d1", analysis="answer", tokens_used=10):
+    cache.add(cache.embed(text), "gpt-4o-mini", 500, sources_digest, analysis, tokens_used)
+
+
+class TestSemanticCache:
+    """Tests for lookup, persistence and recovery."""
+
+    def test_lookup_empty(self, tmp_path):
+        cache = make_cache(tmp_path)
+        assert cache.lookup(cache.embed("tariffs"), "gpt-4o-mini", 500, "d1") is None
+
+    def test_similar_query_hits(self, tmp_path):
+        cache = make_cache(tmp_path)
+        add(cache, "tariffs")
+
+        assert cache.lookup(cache.embed("tariff impact"), "gpt-4o-mini", 500, "d1") == ("answer", 10)
+        assert cache.lookup(cache.embed("weather"), "gpt-4o-mini", 500, "d1") is None
+
+    def test_filters_must_match(self, tmp_path):
+        cache = make_cache(tmp_path)
+        add(cache, "tariffs")
+        vector = cache.embed("tariffs")
+
+        assert cache.lookup(vector, "gpt-4o", 500, "d1") is None
+        assert cache.lookup(vector, "gpt-4o-mini", 1000, "d1") is None
+        assert cache.lookup(vector, "gpt-4o-mini", 500, "d2") is None
+
+    def test_reload_after_save(self, tmp_path):
+        cache = make_cache(tmp_path)
+        add(cache, "tariffs")
+        cache.save()
+
+        reloaded = make_cache(tmp_path)
+        assert reloaded.index.ntotal == 1
+        assert reloaded.lookup(reloaded.embed("tariffs"), "gpt-4o-mini", 500, "d1") == ("answer", 10)
+
+    def test_index_snapshot_every_save_every(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(semantic, "SAVE_EVERY", 2)
+        cache = make_cache(tmp_path)
+        add(cache, "tariffs")
+        assert not os.path.exists(cache.index_path)
+
+        add(cache, "weather")
+        assert faiss.read_index(cache.index_path).ntotal == 2
+
+    def test_missing_index_rebuilt_from_log(self, tmp_path):
+        cache = make_cache(tmp_path)
+        add(cache, "tariffs")
+        assert not os.path.exists(cache.index_path)
+
+        reloaded = make_cache(tmp_path)
+        assert reloaded.index.ntotal == 1
+        assert reloaded.lookup(reloaded.embed("tariffs"), "gpt-4o-mini", 500, "d1") == ("answer", 10)
+
+    def test_lagging_index_topped_up(self, tmp_path):
+        cache = make_cache(tmp_path)
+        add(cache, "tariffs", analysis="first")
+        cache.save()
+        add(cache, "weather", analysis="second")
+
+        reloaded = make_cache(tmp_path)
+        assert reloaded.index.ntotal == 2
+        assert reloaded.lookup(reloaded.embed("weather"), "gpt-4o-mini", 500, "d1") == ("second", 10)
+
+    def test_index_ahead_of_log_rebuilt(self, tmp_path):
+        cache = make_cache(tmp_path)
+        add(cache, "tariffs")
+        add(cache, "weather")
+        cache.save()
+
+        with open(cache.entries_path, encoding="utf-8") as f:
+            first = f.readline()
+        with open(cache.entries_path, "w", encoding="utf-8") as f:
+            f.write(first)
+
+        reloaded = make_cache(tmp_path)
+        assert reloaded.index.ntotal == 1
+        assert reloaded.lookup(reloaded.embed("weather"), "gpt-4o-mini", 500, "d1") is None
+
+    def test_partial_last_line_truncated(self, tmp_path):
+        cache = make_cache(tmp_path)
+        add(cache, "tariffs")
+        with open(cache.entries_path, "a", encoding="utf-8") as f:
+            f.write('{"model": "gpt')
+
+        reloaded = make_cache(tmp_path)
+        assert len(reloaded.entries) == 1
+        add(reloaded, "weather", analysis="second")
+
+        again = make_cache(tmp_path)
+        assert len(again.entries) == 2
+        assert again.lookup(again.embed("weather"), "gpt-4o-mini", 500, "d1") == ("second", 10)
+
+    def test_other_model_entries_discarded(self, tmp_path):
+        cache = make_cache(tmp_path)
+        add(cache, "tariffs")
+        cache.save()
+
+        same_dimension = make_cache(tmp_path, model_name="other-model")
+        assert same_dimension.index.ntotal == 0
+        assert same_dimension.lookup(same_dimension.embed("tariffs"), "gpt-4o-mini", 500, "d1") is None
+
+    def test_other_dimension_entries_discarded(self, tmp_path):
+        cache = make_cache(tmp_path)
+        add(cache, "tariffs")
+        cache.save()
+
+        wider = make_cache(tmp_path, model_name="wide-model", encoder=WideStubEncoder())
+        assert wider.index.ntotal == 0
+        assert wider.index.d == 8
+        add(wider, "weather", analysis="wide")
+
+        reloaded = make_cache(tmp_path, model_name="wide-model", encoder=WideStubEncoder())
+        assert len(reloaded.entries) == 1
+        assert reloaded.lookup(reloaded.embed("weather"), "gpt-4o-mini", 500, "d1") == ("wide", 10)
+
+    def test_size_cap_drops_oldest(self, tmp_path):
+        cache = make_cache(tmp_path, max_entries=2)
+        add(cache, "tariffs", analysis="first")
+        add(cache, "weather", analysis="second")
+        add(cache, "tariff impact", sources_digest="d2", analysis="third")
+
+        assert len(cache.entries) == 2
+        assert cache.index.ntotal == 2
+        assert cache.lookup(cache.embed("tariffs"), "gpt-4o-mini", 500, "d1") is None
+        assert cache.lookup(cache.embed("weather"), "gpt-4o-mini", 500, "d1") == ("second", 10)
+
+        reloaded = make_cache(tmp_path, max_entries=2)
+        assert len(reloaded.entries) == 2
+        assert reloaded.lookup(reloaded.embed("tariff impact"), "gpt-4o-mini", 500, "d2") == ("third", 10)
+
+    def test_crash_during_compaction_rebuilds_index(self, tmp_path, monkeypatch):
+        cache = make_cache(tmp_path, max_entries=2)
+        add(cache, "tariffs", analysis="first")
+        add(cache, "weather", analysis="second")
+        cache.save()
+
+        # Crash after the log is rewritten but before the new snapshot
+        def crash():
+            raise OSError("killed")
+        monkeypatch.setattr(cache, "_save_snapshot", crash)
+        with pytest.raises(OSError):
+            add(cache, "elections", analysis="third")
+
+        reloaded = make_cache(tmp_path, max_entries=2)
+        assert reloaded.lookup(reloaded.embed("tariffs"), "gpt-4o-mini", 500, "d1") is None
+        assert reloaded.lookup(reloaded.embed("weather"), "gpt-4o-mini", 500, "d1") == ("second", 10)
+        assert reloaded.lookup(reloaded.embed("elections"), "gpt-4o-mini", 500, "d1") == ("third", 10)
+
+    def test_size_cap_applied_on_load(self, tmp_path):
+        cache = make_cache(tmp_path)
+        add(cache, "tariffs", analysis="first")
+        add(cache, "weather", analysis="second")
+
+        smaller = make_cache(tmp_path, max_entries=1)
+        assert len(smaller.entries) == 1
+        assert smaller.lookup(smaller.embed("weather"), "gpt-4o-mini", 500, "d1") == ("second", 10)
+        with open(smaller.entries_path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 1
+
+    @pytest.mark.parametrize("max_entries", [0, -1])
+    def test_size_below_one_rejected(self, tmp_path, max_entries):
+        with pytest.raises(ValueError):
+            make_cache(tmp_path, max_entries=max_entries)